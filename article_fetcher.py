@@ -0,0 +1,165 @@
+import os
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import requests
+from bs4 import BeautifulSoup
+from config import FULL_TEXT, USER_AGENT
+from text_processing import prepare_article
+
+# Tags that never hold article text
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'iframe', 'nav', 'header', 'footer',
+                    'aside', 'form', 'button', 'svg', 'figure']
+
+# Class/id fragments used by Italian portals for menus, banners and related links
+BOILERPLATE_HINTS = ('menu', 'nav', 'footer', 'header', 'sidebar', 'cookie', 'banner',
+                     'share', 'social', 'related', 'correlati', 'newsletter', 'advert', 'pubblicita')
+
+def extract_article_text(html_bytes, min_paragraph_length=40):
+    """Strip boilerplate from a page and return its main body text.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    try:
+        soup = BeautifulSoup(html_bytes, 'html.parser')
+        for element in soup(BOILERPLATE_TAGS):
+            element.decompose()
+        for element in soup.find_all(True):
+            if element.decomposed or element.attrs is None:
+                continue
+            marker = ' '.join(element.get('class', [])) + ' ' + (element.get('id') or '')
+            if any(hint in marker.lower() for hint in BOILERPLATE_HINTS):
+                element.decompose()
+
+        # Pick the container holding the most paragraph text
+        best_text = ''
+        containers = soup.find_all(['article', 'main']) or [soup.body or soup]
+        for container in containers:
+            paragraphs = [' '.join(p.get_text(' ').split()) for p in container.find_all('p')]
+            text = '\n'.join(p for p in paragraphs if len(p) >= min_paragraph_length)
+            if len(text) > len(best_text):
+                best_text = text
+        return best_text
+    except Exception as e:
+        print(f"    Error extracting article text: {str(e)}")
+        return ''
+
+class ArticleFetcher:
+    """Download article bodies in threads and clean them in a process pool.
+
+    Both pools are started on the first fetch_texts() call and reused by the
+    following ones until close(). Each download thread keeps its own
+    requests.Session, since sessions are not safe to share between threads.
+    """
+
+    def __init__(self, max_bytes=None, per_host=None, threads=None, processes=None, timeout=None):
+        self.max_bytes = max_bytes or FULL_TEXT['max_bytes']
+        self.per_host = per_host or FULL_TEXT['per_host']
+        self.threads = threads or FULL_TEXT['threads']
+        self.processes = processes or FULL_TEXT['processes'] or os.cpu_count()
+        self.timeout = timeout or FULL_TEXT['timeout']
+        self.host_limits = {}
+        self.host_lock = threading.Lock()
+        self.local = threading.local()
+        self.sessions = []
+        self.thread_pool = None
+        self.process_pool = None
+
+    def _session(self):
+        """This thread's session, created on its first download."""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+            session.headers.update({
+                'User-Agent': USER_AGENT,
+                'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'it-IT,it;q=0.9'
+            })
+            with self.host_lock:
+                self.sessions.append(session)
+        return session
+
+    def _host_semaphore(self, url):
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self.host_lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_limits[host]
+
+    def download(self, url):
+        """Fetch at most max_bytes of a page, holding one of its host's slots."""
+        with self._host_semaphore(url):
+            try:
+                with self._session().get(url, timeout=self.timeout, stream=True) as response:
+                    if response.status_code != 200:
+                        return None
+                    content_type = response.headers.get('Content-Type', '')
+                    if content_type and 'html' not in content_type:
+                        return None
+                    chunks = []
+                    size = 0
+                    for chunk in response.iter_content(chunk_size=65536):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= self.max_bytes:
+                            break
+                    return b''.join(chunks)[:self.max_bytes]
+            except requests.exceptions.RequestException as e:
+                print(f"    Error downloading {url}: {str(e)}")
+                return None
+
+    def fetch_texts(self, urls):
+        """Return {url: body text} for every url whose page could be fetched and cleaned."""
+        urls = list(dict.fromkeys(u for u in urls if u and u.startswith('http')))
+        texts = {}
+        if not urls:
+            return texts
+
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(max_workers=self.processes)
+            self.thread_pool = ThreadPoolExecutor(max_workers=self.threads)
+        downloads = {self.thread_pool.submit(self.download, url): url for url in urls}
+        extractions = {}
+        # Hand each page to the process pool as soon as it arrives
+        for future in as_completed(downloads):
+            html_bytes = future.result()
+            if html_bytes:
+                extractions[self.process_pool.submit(extract_article_text, html_bytes)] = downloads[future]
+        for future in as_completed(extractions):
+            text = future.result()
+            if text:
+                texts[extractions[future]] = text
+
+        print(f"  Extracted full text for {len(texts)}/{len(urls)} articles")
+        return texts
+
+    def close(self):
+        """Shut down the pools and close the threads' sessions."""
+        if self.process_pool is not None:
+            self.thread_pool.shutdown()
+            self.process_pool.shutdown()
+            self.thread_pool = self.process_pool = None
+        for session in self.sessions:
+            session.close()
+        self.sessions = []
+        self.local = threading.local()
+
+def attach_full_text(articles, link_key='link', fetcher=None):
+    """Store the extracted body of each article under 'content', refreshing its cached tokens.
+
+    A fetcher passed in keeps its pools for the next call; one created here is closed.
+    """
+    own_fetcher = fetcher is None
+    fetcher = fetcher or ArticleFetcher()
+    try:
+        texts = fetcher.fetch_texts(a.get(link_key) for a in articles)
+    finally:
+        if own_fetcher:
+            fetcher.close()
+    for article in articles:
+        text = texts.get(article.get(link_key))
+        if text:
+            article['content'] = text
+            if 'tokens' in article:
+                prepare_article(article)
+    return articles
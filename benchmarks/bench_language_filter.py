@@ -0,0 +1,49 @@
+"""Benchmark the character-trigram language prefilter.
+
+Items join two random word windows cut from the same language's training corpus
+(data/language_corpus), so nearly every item is a distinct string.
+Usage: python benchmarks/bench_language_filter.py [items]
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+from language_filter import get_identifier, load_corpora
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    corpora = [[line.split() for line in text.splitlines() if len(line.split()) >= 4]
+               for text in load_corpora().values()]
+
+    def window(lines):
+        words = rng.choice(lines)
+        start = rng.randrange(len(words) - 3)
+        return words[start:start + rng.randint(4, 12)]
+
+    items = []
+    for _ in range(count):
+        lines = rng.choice(corpora)
+        items.append(' '.join(window(lines) + window(lines)))
+    identifier = get_identifier()
+
+    start = time.perf_counter()
+    detected = [identifier.detect(item)[0] for item in items]
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{n} {language}" for language, n in Counter(detected).most_common())
+    print(f"{len(set(items))} distinct items of {count}: {summary}")
+    print(f"one at a time: {count / elapsed:10,.0f} items/s")
+
+    start = time.perf_counter()
+    batch = identifier.detect_many(items)
+    elapsed = time.perf_counter() - start
+    assert [d for d, _ in batch] == detected
+    print(f"batched:       {count / elapsed:10,.0f} items/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Benchmark the Italian lexicon scorer on synthetic headlines.
+
+Usage: python benchmarks/bench_lexicon_sentiment.py [texts] [words_per_text]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment_lexicon import LexiconScorer
+
+WORDS = ('ottimo risultato crescita utile perdita crisi calo polizza clienti servizio '
+         'alleanza assicurazioni il la di per non nuovo mercato premiato sinistri').split()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    rng = random.Random(0)
+    texts = [' '.join(rng.choice(WORDS) for _ in range(length)) for _ in range(count)]
+    scorer = LexiconScorer(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        'data', 'italian_sentiment_lexicon.tsv'))
+
+    for label in ('cold', 'warm'):
+        start = time.perf_counter()
+        scores = scorer.score_batch(texts)
+        elapsed = time.perf_counter() - start
+        assert len(scores) == count
+        print(f"{label}  {count / elapsed:12,.0f} texts/s  ({length} words each)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the compiled relevance rules against the original substring checks.
+
+The original checks are looser (no word boundaries, exclusions or context
+window), so they are a speed reference, not an equivalent implementation.
+
+Usage: python benchmarks/bench_relevance.py [items]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import COMPANY_NAMES
+from company_matcher import get_relevance_rule
+
+TITLES = [
+    'Vita Nuova lancia una nuova polizza per la previdenza',
+    'Una nuova vita per il centro storico',
+    'Alleanza Atlantica, vertice a Bruxelles',
+    'Alleanza Assicurazioni chiude il trimestre in crescita',
+    'Unidea Assicurazioni rinnova la rete di agenti',
+    'Borsa, seduta positiva per le banche'
+]
+DESCRIPTIONS = [
+    'Il gruppo punta su risparmio e protezione delle famiglie italiane.',
+    'La città si prepara a un fine settimana di eventi e concerti.',
+    'I ministri hanno discusso di difesa comune e bilanci.',
+    ''
+]
+
+def legacy_is_relevant(title, description, company):
+    title = title.lower() if title else ""
+    description = description.lower() if description else ""
+    company_lower = company.lower()
+    if company_lower == "vita nuova":
+        if "nuova vita" in title or "nuova vita" in description:
+            return False
+        insurance_terms = [
+            "assicurazioni", "assicurazione", "polizza", "broker", "finanziaria",
+            "previdenza", "risparmio", "protezione", "pensione", "investimento"
+        ]
+        if "vita nuova" in title or "vita nuova" in description:
+            text = f"{title} {description}"
+            return any(term in text for term in insurance_terms)
+        return False
+    return all(word in title or word in description for word in company_lower.split())
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    items = [{'title': rng.choice(TITLES), 'description': rng.choice(DESCRIPTIONS)} for _ in range(count)]
+
+    for company in COMPANY_NAMES:
+        start = time.perf_counter()
+        legacy = [a for a in items if legacy_is_relevant(a['title'], a['description'], company)]
+        legacy_time = time.perf_counter() - start
+
+        rule = get_relevance_rule(company)
+        start = time.perf_counter()
+        compiled = rule.filter(items)
+        compiled_time = time.perf_counter() - start
+
+        print(f"{company}:")
+        print(f"  legacy   {count / legacy_time:12,.0f} items/s  kept {len(legacy)}")
+        print(f"  compiled {count / compiled_time:12,.0f} items/s  kept {len(compiled)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark training and batch scoring of the hashed relevance classifier.
+
+The labelled candidates are synthetic (a few template headlines), so the
+held-out accuracies printed by train() only check that fitting works; they are
+not a measure of the model against the rules on real news.
+
+Usage: python benchmarks/bench_relevance_model.py [items]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from relevance_model import RelevanceClassifier, train
+
+# (company, mention, relevant): the ambiguous names in both senses
+MENTIONS = [
+    ('Vita Nuova', 'Vita Nuova Assicurazioni', 1),
+    ('Vita Nuova', 'la compagnia Vita Nuova', 1),
+    ('Vita Nuova', 'il festival Vita Nuova', 0),
+    ('Vita Nuova', 'la Vita Nuova di Dante', 0),
+    ('Alleanza Assicurazioni', 'Alleanza Assicurazioni', 1),
+    ('Alleanza Assicurazioni', 'gli agenti di Alleanza', 1),
+    ('Alleanza Assicurazioni', "l'alleanza di centrodestra", 0),
+    ('Alleanza Assicurazioni', "un'alleanza tra i sindaci", 0),
+    ('Unidea Assicurazioni', 'Unidea Assicurazioni', 1),
+    ('Unidea Assicurazioni', 'il premio Unidea per il design', 0)
+]
+CONTEXT = {
+    1: ['lancia una polizza per la previdenza', 'chiude il semestre con premi in crescita',
+        'rinnova la rete di agenti', 'punta sul risparmio delle famiglie'],
+    0: ['apre la stagione con un concerto', 'discute la legge di bilancio in consiglio',
+        'presenta la mostra in centro', 'organizza una giornata di volontariato']
+}
+FILLER = ['oggi', 'a Milano', 'secondo i dati', 'in una nota', 'per il prossimo anno', 'con i partner']
+
+def example(rng):
+    company, mention, relevant = rng.choice(MENTIONS)
+    # Some candidates borrow the other sense's context, as real headlines do
+    context = rng.choice(CONTEXT[relevant if rng.random() < 0.85 else 1 - relevant])
+    return company, f"{mention} {context}", f"{rng.choice(FILLER)} {rng.choice(FILLER)}", relevant
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        labels_file = os.path.join(directory, 'labels.csv')
+        with open(labels_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['company', 'title', 'description', 'relevant'])
+            writer.writerows(example(rng) for _ in range(2000))
+        model_file = os.path.join(directory, 'model.npz')
+        started = time.perf_counter()
+        train([labels_file], model_file)
+        print(f"trained in {time.perf_counter() - started:.2f} s")
+        model = RelevanceClassifier.load(model_file)
+
+    candidates = [example(rng)[:3] for _ in range(count)]
+    started = time.perf_counter()
+    probabilities = model.probabilities(candidates)
+    elapsed = time.perf_counter() - started
+    print(f"scored {count:,} candidates at {count / elapsed:,.0f} items/s "
+          f"({(probabilities >= model.threshold).sum()} relevant)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark incremental indexing and BM25 queries on a synthetic collection.
+
+Usage: python benchmarks/bench_search_index.py [articles] [batch size]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import ArticleIndex
+
+SYLLABLES = 'ca sa ri to ne la mo vi pre stu po li ta ve de gi ra co sti ni'.split()
+
+QUERIES = ['unidea previdenza', 'polizza vita unidea', 'alleanza risultati semestre', 'sinistri auto grandine']
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = random.Random(0)
+    # Zipf-like vocabulary, plus the query words at realistic frequencies
+    vocabulary = sorted({''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(30000)})
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    rng.shuffle(weights)
+    # Query words from very common (in most articles) to rare
+    common = {'polizza': 0.5, 'vita': 0.3, 'risultati': 0.1, 'auto': 0.1, 'alleanza': 0.05,
+              'unidea': 0.03, 'semestre': 0.02, 'previdenza': 0.01, 'sinistri': 0.005, 'grandine': 0.001}
+    vocabulary += list(common)
+    weights += list(common.values())
+
+    def article(i):
+        words = rng.choices(vocabulary, weights, k=60)
+        return {'title': ' '.join(words[:8]), 'description': ' '.join(words[8:]), 'link': f'https://example.it/{i}'}
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = ArticleIndex(os.path.join(directory, 'search.sqlite'))
+        indexing = 0.0
+        for start in range(0, count, batch_size):
+            batch = [article(i) for i in range(start, min(count, start + batch_size))]
+            started = time.perf_counter()
+            index.add(batch)
+            indexing += time.perf_counter() - started
+        print(f"indexed {count:,} articles at {count / indexing:,.0f} articles/s "
+              f"({os.path.getsize(index.path) / 2 ** 20:.0f} MB)")
+
+        index.search(QUERIES[0])  # loads document lengths once
+        for query in QUERIES:
+            started = time.perf_counter()
+            for _ in range(20):
+                results = index.search(query)
+            elapsed = (time.perf_counter() - started) / 20
+            print(f"{elapsed * 1000:7.2f} ms  {query!r} ({len(results)} results)")
+        index.close()
+
+if __name__ == "__main__":
+    main()
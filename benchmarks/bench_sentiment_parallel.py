@@ -0,0 +1,37 @@
+"""Benchmark batch sentiment scoring across worker counts.
+
+Usage: python benchmarks/bench_sentiment_parallel.py [texts] [max_workers]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment import score_texts, textblob_polarity
+
+WORDS = ('ottimo risultato crescita utile perdita crisi calo polizza clienti servizio '
+         'good great bad poor excellent terrible growth profit loss strong weak').split()
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    rng = random.Random(0)
+    texts = [' '.join(rng.choice(WORDS) for _ in range(25)) for _ in range(count)]
+    # Load TextBlob's lexicon before any timing, so the first configuration does not pay for it
+    # (forked workers inherit the loaded lexicon)
+    textblob_polarity(texts[0])
+
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        scores = list(score_texts(texts, textblob_polarity, workers=workers))
+        elapsed = time.perf_counter() - start
+        assert len(scores) == count
+        baseline = baseline or elapsed
+        print(f"{workers:3d} workers  {count / elapsed:10,.0f} texts/s  speedup {baseline / elapsed:5.2f}x")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark container-scoped extraction against the legacy four-select + zip approach.
+
+Usage: python benchmarks/bench_site_extraction.py [saved_page.html ...]
+Without arguments a synthetic WordPress-style listing page is used.
+"""
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from site_extraction import extract_site_articles
+
+SOURCE = {
+    'container_selector': 'article',
+    'title_selector': 'h2.entry-title',
+    'content_selector': 'div.entry-content',
+    'date_selector': 'time.entry-date',
+    'link_selector': 'h2.entry-title a'
+}
+
+def synthetic_page(articles=200, filler=40):
+    parts = ['<html><body><nav>' + '<a href="/x">menu</a>' * filler + '</nav><main>']
+    for i in range(articles):
+        # Every third article has no date, as on real listing pages
+        date = '' if i % 3 == 0 else f'<time class="entry-date" datetime="2024-02-{i % 28 + 1:02d}">{i % 28 + 1} febbraio 2024</time>'
+        parts.append(
+            f'<article><h2 class="entry-title"><a href="/articolo-{i}">Titolo {i} Alleanza</a></h2>'
+            f'{date}<div class="entry-content"><p>Testo dell\'articolo {i} ' + 'parole ' * filler + '</p></div></article>'
+        )
+    parts.append('</main><footer>' + '<p>footer</p>' * filler + '</footer></body></html>')
+    return ''.join(parts)
+
+def legacy_extract(soup, source, limit=20):
+    titles = soup.select(source['title_selector'])
+    contents = soup.select(source['content_selector'])
+    dates = soup.select(source['date_selector'])
+    links = soup.select(source['link_selector'])
+    return [
+        {'title': t.text, 'content': c.text, 'date': d.text, 'link': l.get('href', '')}
+        for t, c, d, l in zip(titles[:limit], contents[:limit], dates[:limit], links[:limit])
+    ]
+
+def count_misaligned(soup, source, limit=20):
+    """Count legacy rows whose date element belongs to a different article than the title."""
+    titles = soup.select(source['title_selector'])[:limit]
+    dates = soup.select(source['date_selector'])[:limit]
+    return sum(1 for t, d in zip(titles, dates) if t.find_parent('article') is not d.find_parent('article'))
+
+def time_it(func, soup, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(soup, SOURCE)
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    pages = sys.argv[1:]
+    if pages:
+        documents = [(path, open(path, 'rb').read()) for path in pages]
+    else:
+        documents = [('synthetic', synthetic_page())]
+
+    for name, document in documents:
+        soup = BeautifulSoup(document, 'lxml')
+        legacy_time, legacy_items = time_it(legacy_extract, soup, 20)
+        scoped_time, scoped_items = time_it(extract_site_articles, soup, 20)
+        misaligned = count_misaligned(soup, SOURCE)
+        print(f"{name}:")
+        print(f"  legacy  {legacy_time * 1000:8.2f} ms  {len(legacy_items)} items")
+        print(f"  scoped  {scoped_time * 1000:8.2f} ms  {len(scoped_items)} items")
+        print(f"  speedup {legacy_time / scoped_time:.1f}x, legacy rows with misaligned dates: {misaligned}")
+
+if __name__ == "__main__":
+    main()
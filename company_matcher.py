@@ -0,0 +1,246 @@
+from collections import namedtuple, deque
+import re
+from config import (COMPANY_NAMES, COMPANY_VARIATIONS, KEYWORDS, AMBIGUOUS_VARIATIONS,
+                    RELEVANCE_EXCLUSIONS, INSURANCE_CONTEXT_TERMS, RELEVANCE_CONTEXT_CHARS)
+
+Matches = namedtuple('Matches', ['companies', 'keywords'])
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton: finds every occurrence of every pattern in one pass over the text."""
+
+    def __init__(self):
+        self.transitions = [{}]  # state -> {char: next state}
+        self.fail = [0]
+        self.outputs = [[]]  # state -> ids of patterns ending here
+        self.patterns = []
+        self.built = False
+
+    def add(self, pattern, value):
+        """Register a (lowercase) pattern; matches report value."""
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append(len(self.patterns))
+        self.patterns.append((pattern, value))
+        self.built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque()
+        for state in self.transitions[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+        self.built = True
+
+    def iter_matches(self, text):
+        """Yield (end index, pattern, value) for every match in text."""
+        if not self.built:
+            self.build()
+        transitions, fail, outputs, patterns = self.transitions, self.fail, self.outputs, self.patterns
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            for pattern_id in outputs[state]:
+                pattern, value = patterns[pattern_id]
+                yield index, pattern, value
+
+class CompanyMatcher:
+    """Company and keyword detection with a single automaton over all names and variations."""
+
+    def __init__(self, companies, keywords=()):
+        # companies: {company: [terms that identify it]}
+        self.companies = list(companies)
+        self.automaton = KeywordAutomaton()
+        for company, variations in companies.items():
+            for term in set(variations):
+                self.automaton.add(term.lower(), ('company', company))
+        for keyword in keywords:
+            self.automaton.add(keyword.lower(), ('keyword', keyword))
+        self.automaton.build()
+
+    def match(self, text):
+        """Return the companies and keywords mentioned anywhere in text."""
+        companies = set()
+        keywords = set()
+        for _, _, (kind, value) in self.automaton.iter_matches((text or '').lower()):
+            if kind == 'company':
+                companies.add(value)
+            else:
+                keywords.add(value)
+        return Matches(companies, keywords)
+
+    def mentions(self, text):
+        """Companies mentioned in text, in watchlist order."""
+        found = self.match(text).companies
+        return [company for company in self.companies if company in found]
+
+def build_default_matcher(extra_companies=()):
+    """Matcher for COMPANY_NAMES / COMPANY_VARIATIONS and KEYWORDS from config."""
+    companies = {}
+    for name in list(COMPANY_NAMES) + list(extra_companies):
+        companies.setdefault(name, [name] + COMPANY_VARIATIONS.get(name, []))
+    return CompanyMatcher(companies, KEYWORDS)
+
+# Built once at startup and shared by every scanner
+DEFAULT_MATCHER = build_default_matcher()
+
+def _phrase_pattern(phrases):
+    """Regex alternation for phrases, factored into a trie so shared prefixes are tried once."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in ' '.join(phrase.lower().split()):
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node):
+        branches = []
+        for char in sorted(c for c in node if c):
+            token = r'\s+' if char == ' ' else re.escape(char)
+            branches.append(token + render(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A phrase may end here and also continue into a longer one
+        return f'(?:{body})?' if '' in node else body
+
+    return render(trie)
+
+def _needles(phrases):
+    """A few words that between them occur in every phrase, so a text containing none of them matches no phrase."""
+    phrases = {' '.join(p.lower().split()) for p in phrases}
+    needles = []
+    while phrases:
+        words = {w for p in phrases for w in re.findall(r'\w+', p) or [p]}
+        # The word shared by the most remaining phrases, the longest one on ties
+        needle = max(sorted(words), key=lambda w: (sum(w in p for p in phrases), len(w)))
+        needles.append(needle)
+        phrases = {p for p in phrases if needle not in p}
+    return tuple(needles)
+
+# Apostrophes of elided articles: "l'alleanza", "un'alleanza", "dell'alleanza"
+ELISION_MARKS = "'’"
+
+STRONG, WEAK, EXCLUDE = 'strong', 'weak', 'exclude'
+
+class RelevanceRule:
+    """Relevance test for one company, compiled into a single word-boundary regex.
+
+    An article is relevant when it contains a distinctive name variation, or an
+    ambiguous one (e.g. "Alleanza") with an insurance term within context_chars
+    of it. An exclusion phrase ("alleanza atlantica") only rules out the ambiguous
+    mention it covers, and an ambiguous name right after an elided article
+    ("l'alleanza", "un'alleanza") is the common noun, not the company.
+    """
+
+    def __init__(self, company, variations, ambiguous=(), exclusions=(), context_terms=(),
+                 context_chars=RELEVANCE_CONTEXT_CHARS):
+        ambiguous_lower = {' '.join(a.lower().split()) for a in ambiguous}
+        names = {' '.join(n.lower().split()) for n in [company] + list(variations)}
+        self.kinds = {' '.join(e.lower().split()): EXCLUDE for e in exclusions}
+        self.kinds.update((n, WEAK if n in ambiguous_lower else STRONG) for n in names)
+        self.company = company
+        self.context_terms = tuple(t.lower() for t in context_terms)
+        self.context_chars = context_chars
+        # Every name variation contains one of these words
+        self.needles = _needles(names)
+        # The company's own name first: it is the most common spelling
+        self.names = tuple(sorted(names, key=lambda n: n != ' '.join(company.lower().split())))
+        # The regex jumps straight to the first letters of its phrases; a lookbehind
+        # for the start boundary would stop that, so it is checked in Python
+        self.regex = re.compile('(?:' + _phrase_pattern(self.kinds) + r')(?!\w)')
+
+    def is_relevant(self, title, description):
+        """Substring tests rule out most texts; one regex scan, stopped as soon as the answer is known, decides the rest."""
+        title = title.lower() if title else ''
+        description = description.lower() if description else ''
+        for needle in self.needles:
+            if needle in title or needle in description:
+                break
+        else:
+            return False
+        for name in self.names:
+            if name in title or name in description:
+                break
+        else:
+            # A name is only missing verbatim if unusual whitespace splits its words
+            if ('  ' not in title and '  ' not in description
+                    and title.isprintable() and description.isprintable()):
+                return False
+        # Padded so that every match has a character on both sides; '|' keeps names from spanning the two fields
+        text = f" {title} | {description} "
+        kinds = self.kinds
+        search = self.regex.search
+        match = search(text)
+        while match:
+            start, end = match.span()
+            before = text[start - 1]
+            if not (before.isalnum() or before == '_'):
+                phrase = match.group()
+                kind = kinds.get(phrase) or kinds[' '.join(phrase.split())]
+                if kind is STRONG:
+                    return True
+                if kind is WEAK and before not in ELISION_MARKS and self._has_context(text, start):
+                    return True
+            for needle in self.needles:
+                if text.find(needle, end) != -1:
+                    break
+            else:
+                return False
+            match = search(text, end)
+        return False
+
+    def _has_context(self, text, position):
+        """Whether a context term starts within context_chars of position in the padded text."""
+        low = max(position - self.context_chars, 0)
+        high = position + self.context_chars
+        for term in self.context_terms:
+            if term in text:
+                start = text.find(term, low)
+                while start != -1 and start <= high:
+                    end = start + len(term)
+                    if not (text[start - 1].isalnum() or text[start - 1] == '_'
+                            or text[end].isalnum() or text[end] == '_'):
+                        return True
+                    start = text.find(term, start + 1)
+        return False
+
+    def filter(self, articles, title_key='title', description_key='description'):
+        """Batch API: keep the articles of a result list that pass the rule."""
+        is_relevant = self.is_relevant
+        return [a for a in articles if is_relevant(a.get(title_key), a.get(description_key))]
+
+RELEVANCE_RULES = {}
+
+def get_relevance_rule(company):
+    """Compiled rule for a company, built on first use."""
+    rule = RELEVANCE_RULES.get(company)
+    if rule is None:
+        rule = RelevanceRule(
+            company,
+            COMPANY_VARIATIONS.get(company, []),
+            ambiguous=AMBIGUOUS_VARIATIONS,
+            exclusions=RELEVANCE_EXCLUSIONS.get(company, []),
+            context_terms=INSURANCE_CONTEXT_TERMS
+        )
+        RELEVANCE_RULES[company] = rule
+    return rule
@@ -1,16 +1,26 @@
 import os
 import json
 from datetime import datetime, timedelta
-from collections import Counter
 from GoogleNews import GoogleNews
 import requests
 from bs4 import BeautifulSoup
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 from matplotlib_venn import venn3, venn3_circles
-from textblob import TextBlob
-import nltk
-from config import COMPANY_NAMES, COMPANY_VARIATIONS, NEWS_SEARCH
+from config import COMPANY_NAMES, NEWS_SEARCH, FULL_TEXT
+from news_dates import normalize_article_dates, sort_by_date, filter_window, dedupe_articles
+from article_fetcher import attach_full_text
+from company_matcher import DEFAULT_MATCHER
+from relevance_model import filter_relevant_articles
+from text_processing import STOP_WORD_FILTER, article_text, prepare_articles, article_tokens
+from term_matrix import TermMatrix
+from near_duplicates import collapse_near_duplicates
+from url_index import clean_url, dedupe_by_url
+from overlap import CoMentionCounter, group_by_mask, region_mask, venn3_subsets, plot_upset
+from topic_store import TopicStore
+from search_index import ArticleIndex
+from language_filter import filter_language
+from sentiment import cached_polarity, cached_polarities
 import pandas as pd
 from PIL import Image
 import numpy as np
@@ -29,53 +39,14 @@ if not NEWS_API_KEY:
     raise ValueError("Please set NEWS_API_KEY in your .env file")
 
 def clean_google_news_url(url):
-    # Remove Google News tracking parameters
-    if '&' in url:
-        clean_url = url.split('&')[0]
-    else:
-        clean_url = url
+    # Unwrap Google News links; the target link itself is kept as published
+    cleaned = clean_url(url)
         
     # Special handling for polesine24.it
-    if 'polesine24.it' in clean_url and not clean_url.endswith('?id=0'):
-        clean_url = clean_url + '?id=0'
+    if 'polesine24.it' in cleaned and not cleaned.endswith('?id=0'):
+        cleaned = cleaned + ('&id=0' if '?' in cleaned else '?id=0')
         
-    return clean_url
-
-def is_relevant_article(title, description, company):
-    """Check if an article is truly relevant to the company."""
-    title = title.lower() if title else ""
-    description = description.lower() if description else ""
-    company_lower = company.lower()
-    
-    # Special case for "Vita Nuova" to avoid false positives
-    if company_lower == "vita nuova":
-        # First, explicitly reject any articles containing "nuova vita"
-        if "nuova vita" in title or "nuova vita" in description:
-            return False
-            
-        # Must have exact phrase "vita nuova" and insurance context
-        insurance_terms = [
-            "assicurazioni", "assicurazione", "polizza", "broker", "finanziaria",
-            "previdenza", "risparmio", "protezione", "pensione", "investimento"
-        ]
-        
-        # Check for exact phrase "vita nuova" with insurance context
-        has_vita_nuova = False
-        has_insurance_context = False
-        
-        # Look for exact phrase "vita nuova"
-        if "vita nuova" in title or "vita nuova" in description:
-            has_vita_nuova = True
-            
-            # Check for insurance context
-            text = f"{title} {description}"
-            has_insurance_context = any(term in text for term in insurance_terms)
-        
-        return has_vita_nuova and has_insurance_context
-    
-    # For other companies, check if all words of the company name appear
-    company_words = company_lower.split()
-    return all(word in title or word in description for word in company_words)
+    return cleaned
 
 def fetch_google_news():
     news_data = {company: [] for company in COMPANY_NAMES}
@@ -93,28 +64,30 @@ def fetch_google_news():
             results = googlenews.result()
             print(f"Found {len(results)} results for {company}")
             
-            for article in results:
-                title = article.get('title', '')
-                desc = article.get('desc', '')
-                
-                # Skip if title or description is missing
-                if not title or not desc:
-                    continue
-                    
-                # Check if article is relevant before adding
-                if is_relevant_article(title, desc, company):
-                    news_data[company].append({
-                        'title': title,
-                        'description': desc,
-                        'link': clean_google_news_url(article.get('link', '')),
-                        'date': article.get('datetime', ''),
-                        'source': 'Google News'
-                    })
-                    print(f"\nKept article for {company}:")
-                    print(f"Title: {title}")
-                    print(f"Description: {desc}")
-            
-            print(f"\nKept {len(news_data[company])} articles for {company}")
+            # Skip results with a missing title or description, then keep the relevant ones
+            complete = [a for a in results if a.get('title') and a.get('desc')]
+            complete, other_language = filter_language(complete)
+            if other_language:
+                print(f"Dropped {other_language} results in other languages")
+            relevant = filter_relevant_articles(complete, company, description_key='desc')
+            
+            for article in relevant:
+                title = article['title']
+                desc = article['desc']
+                news_data[company].append({
+                    'title': title,
+                    'description': desc,
+                    'link': clean_google_news_url(article.get('link', '')),
+                    'date': article.get('datetime', ''),
+                    'source': 'Google News'
+                })
+                print(f"\nKept article for {company}:")
+                print(f"Title: {title}")
+                print(f"Description: {desc}")
+            
+            unparsed = normalize_article_dates(news_data[company])
+            prepare_articles(news_data[company])
+            print(f"\nKept {len(news_data[company])} articles for {company} ({unparsed} with unparseable dates)")
             
             # Clear results for next search
             googlenews.clear()
@@ -243,6 +216,10 @@ def fetch_newsapi_news():
                     print(f"Title: {article['title']}")
                     print(f"Description: {article['description']}")
                 
+                articles, other_language = filter_language(articles)
+                if other_language:
+                    print(f"Dropped {other_language} results in other languages")
+                
                 for article in articles:
                     news_data[company].append({
                         'title': article['title'],
@@ -252,7 +229,9 @@ def fetch_newsapi_news():
                         'source': 'NewsAPI'
                     })
                 
-                print(f"\nKept {len(news_data[company])} articles for {company}")
+                unparsed = normalize_article_dates(news_data[company])
+                prepare_articles(news_data[company])
+                print(f"\nKept {len(news_data[company])} articles for {company} ({unparsed} with unparseable dates)")
             else:
                 print(f"Error fetching news for {company}: {response.status_code} - {response.text}")
             
@@ -266,44 +245,15 @@ def fetch_newsapi_news():
     return news_data
 
 def analyze_sentiment(text):
-    blob = TextBlob(text)
-    return blob.sentiment.polarity
+    return cached_polarity(text)
 
-def generate_word_cloud(text, company):
-    """Generate word cloud from text, excluding company names and insurance-related terms."""
-    if not text.strip():
-        return None
-    
-    # Words to exclude (company names and insurance terms)
-    exclude_words = {
-        # Company names and variations
-        'vitanuova', 'vita', 'nuova', 'unidea', 'alleanza',
-        'vitanuovaassicurazioni', 'unideaassicurazioni', 'alleanzaassicurazioni',
-        'vitanuovaspa', 'unideaspa', 'alleanzaspa',
-        
-        # Insurance terms
-        'assicurazione', 'assicurazioni', 'assicurativa', 'assicurative', 'assicurativi', 'assicurativo',
-        'polizza', 'polizze'
-    }
-    
-    # Clean and filter text
-    words = text.lower().split()
-    filtered_words = []
-    for word in words:
-        # Remove punctuation and numbers
-        clean_word = ''.join(c for c in word if c.isalpha())
-        
-        # Skip if word is too short (less than 5 letters), empty, or in excluded words
-        if len(clean_word) < 5 or not clean_word or clean_word in exclude_words:
-            continue
-            
-        # Skip if the word contains any excluded word
-        if any(excl in clean_word for excl in exclude_words):
-            continue
-        
-        filtered_words.append(clean_word)
-    
-    if not filtered_words:
+def generate_word_cloud(term_matrix, company):
+    """Generate word cloud from the company's term counts, excluding company names and insurance-related terms."""
+    # Skip words that are too short (less than 5 letters), stop words, or contain
+    # a company name or insurance term
+    frequencies = term_matrix.top_terms(company, n=30, min_length=5,
+                                        is_stop_word=STOP_WORD_FILTER.is_stop_word)
+    if not frequencies:
         return None
     
     # Create word cloud
@@ -315,12 +265,26 @@ def generate_word_cloud(text, company):
         max_words=30,
         font_path='arial.ttf',
         prefer_horizontal=0.7
-    ).generate(' '.join(filtered_words))
+    ).generate_from_frequencies(frequencies)
     
     return wordcloud
 
 def create_venn_diagram(venn_sets, labels):
-    """Create a Venn diagram with properly formatted topic display."""
+    """Create a Venn diagram with properly formatted topic display (an UpSet plot when not tracking 3 companies)."""
+    # Group topics by which companies share them, in one pass
+    groups = group_by_mask(venn_sets)
+    
+    # Ensure the results directory exists
+    os.makedirs('results', exist_ok=True)
+    
+    if len(venn_sets) != 3:
+        fig = plot_upset([label.split(' (')[0] for label in labels],
+                         {mask: len(topics) for mask, topics in groups.items()},
+                         title='Topic Analysis')
+        fig.savefig('results/venn_diagram.png', bbox_inches='tight', dpi=300, facecolor='white')
+        plt.close(fig)
+        return
+    
     plt.figure(figsize=(24, 12))
     gs = gridspec.GridSpec(1, 2, width_ratios=[7, 3])
 
@@ -330,16 +294,8 @@ def create_venn_diagram(venn_sets, labels):
     # Define colors for the main circles
     colors = ['#1B1B1B', '#404040', '#808080']  # Armani-style grayscale
     
-    # Calculate set sizes and intersections
-    subsets = [
-        len(venn_sets[0] - venn_sets[1] - venn_sets[2]),  # 100
-        len(venn_sets[1] - venn_sets[0] - venn_sets[2]),  # 010
-        len(venn_sets[2] - venn_sets[0] - venn_sets[1]),  # 001
-        len(venn_sets[0] & venn_sets[1] - venn_sets[2]),  # 110
-        len(venn_sets[1] & venn_sets[2] - venn_sets[0]),  # 011
-        len(venn_sets[0] & venn_sets[2] - venn_sets[1]),  # 101
-        len(venn_sets[0] & venn_sets[1] & venn_sets[2])   # 111
-    ]
+    # Region sizes in venn3 order
+    subsets = venn3_subsets({mask: len(topics) for mask, topics in groups.items()})
     
     # Ensure at least some minimal size for visualization
     min_size = 1
@@ -358,20 +314,21 @@ def create_venn_diagram(venn_sets, labels):
                 venn.patches[i].set_linewidth(2)
         
         # Add topic lists to each region
-        regions = {
-            '100': (venn_sets[0] - venn_sets[1] - venn_sets[2], (-0.33, 0.2)),
-            '010': (venn_sets[1] - venn_sets[0] - venn_sets[2], (0.33, 0.2)),
-            '001': (venn_sets[2] - venn_sets[0] - venn_sets[1], (0, -0.33)),
-            '110': (venn_sets[0] & venn_sets[1] - venn_sets[2], (0, 0.33)),
-            '011': (venn_sets[1] & venn_sets[2] - venn_sets[0], (0.2, -0.2)),
-            '101': (venn_sets[0] & venn_sets[2] - venn_sets[1], (-0.2, -0.2)),
-            '111': (venn_sets[0] & venn_sets[1] & venn_sets[2], (0, 0))
+        positions = {
+            '100': (-0.33, 0.2),
+            '010': (0.33, 0.2),
+            '001': (0, -0.33),
+            '110': (0, 0.33),
+            '011': (0.2, -0.2),
+            '101': (-0.2, -0.2),
+            '111': (0, 0)
         }
         
-        for region_id, (topics, (x, y)) in regions.items():
+        for region_id, (x, y) in positions.items():
+            topics = groups.get(region_mask(region_id))
             if topics:
                 # Format topics as a string (top 3)
-                topic_text = '\n'.join(list(topics)[:3])
+                topic_text = '\n'.join(topics[:3])
                 plt.text(x, y, topic_text,
                         ha='center', va='center',
                         fontsize=8, fontweight='bold',
@@ -424,9 +381,6 @@ def create_venn_diagram(venn_sets, labels):
     plt.suptitle('Topic Analysis', fontsize=14, fontweight='bold', color='#1B1B1B', y=0.98)
     plt.tight_layout()
     
-    # Ensure the results directory exists
-    os.makedirs('results', exist_ok=True)
-    
     # Save the figure with high quality
     plt.savefig('results/venn_diagram.png', 
                 bbox_inches='tight', 
@@ -435,44 +389,16 @@ def create_venn_diagram(venn_sets, labels):
                 edgecolor='none')
     plt.close()
 
-def extract_topics(text):
-    """Extract meaningful topics from text using keyword-based approach."""
-    # Convert to lowercase and split into words
-    words = text.lower().split()
-    
-    # Use the same stop words as word cloud for consistency
-    stop_words = {
-        # Basic Italian stop words
-        'il', 'lo', 'la', 'i', 'gli', 'le', 'un', 'uno', 'una', 'di', 'a', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra',
-        'e', 'ed', 'o', 'ma', 'che', 'chi', 'cui', 'non', 'è', 'come', 'dove', 'quando', 'perché',
-        # Insurance-related terms to exclude
-        'assicurazioni', 'assicurazione', 'assicurativa', 'assicurative', 'assicurativi', 'assicurativo',
-        'polizza', 'polizze', 'agenzia', 'agenzie', 'broker', 'compagnia', 'compagnie', 'spa', 'srl',
-        'mercato', 'settore', 'gruppo', 'società'
-    }
-    
-    # Add company names and variations to stop words
-    for comp_name in COMPANY_NAMES:
-        stop_words.update(word.lower() for word in comp_name.split())
-        for variation in COMPANY_VARIATIONS.get(comp_name, []):
-            stop_words.update(word.lower() for word in variation.split())
-    
-    # Extract potential topics (words with length >= 4)
-    topics = []
-    for word in words:
-        clean_word = ''.join(c for c in word if c.isalpha())
-        if (len(clean_word) >= 4 and 
-            clean_word not in stop_words and 
-            not any(stop in clean_word for stop in stop_words)):
-            topics.append(clean_word)
-    
-    # Count frequencies
-    topic_counts = Counter(topics)
-    
-    # Get top topics (more than one occurrence)
-    significant_topics = {word: count for word, count in topic_counts.items() if count > 1}
-    
-    return significant_topics
+def extract_topics(topic_store, since_timestamp=None, n=10):
+    """Distinctive and shared topics of every company (words of 4+ letters seen more than once), from the stored daily counts.
+
+    Returns {company: {'distinctive': {term: z}, 'shared': {term: count}}}.
+    """
+    history = TermMatrix.from_counts({company: topic_store.term_counts(company, since_timestamp)
+                                      for company in COMPANY_NAMES})
+    # Same stop words as the word cloud
+    return history.distinctive_topics(n=n, min_length=4, min_count=2, n_shared=n,
+                                      is_stop_word=STOP_WORD_FILTER.is_stop_word)
 
 def generate_report(google_news, newsapi_news):
     os.makedirs('results', exist_ok=True)
@@ -481,22 +407,73 @@ def generate_report(google_news, newsapi_news):
     combined_news = {company: [] for company in COMPANY_NAMES}
     company_reviews = {company: [] for company in COMPANY_NAMES}
     
+    # Only keep articles inside the 6 month search window
+    since_timestamp = int((datetime.now() - timedelta(days=180)).timestamp())
+    
     for company in COMPANY_NAMES:
-        # Get news
-        all_news = google_news[company] + newsapi_news[company]
-        all_news.sort(key=lambda x: x.get('date', ''), reverse=True)
+        # Get news, sorted on integer timestamps (undated articles last)
+        # The same link from both sources (or with different tracking parameters) is kept once
+        all_news = dedupe_by_url(google_news[company] + newsapi_news[company])
+        unparsed = normalize_article_dates(all_news)
+        all_news = filter_window(all_news, since_timestamp)
+        all_news = dedupe_articles(sort_by_date(all_news))
+        # One article per syndicated story; the copies are kept under 'duplicates'
+        story_count = len(all_news)
+        all_news = collapse_near_duplicates(all_news)
+        if len(all_news) < story_count:
+            print(f"{company}: collapsed {story_count - len(all_news)} syndicated copies")
         combined_news[company] = all_news
+        if unparsed:
+            print(f"{company}: {unparsed} articles with unparseable dates")
         
         # Get reviews
         company_reviews[company] = fetch_company_reviews(company)
     
-    # Generate word clouds and prepare Venn diagram data
-    company_topics = {}
+    # Tag every article with the companies it mentions; co-mention counts come from the bitmasks
+    co_mentions = CoMentionCounter(COMPANY_NAMES)
+    for company in COMPANY_NAMES:
+        for item in combined_news[company]:
+            mentioned = DEFAULT_MATCHER.match(article_text(item)).companies | {company}
+            # dedupe_by_url set 'url_hash' on every article with a link
+            co_mentions.tag(item, mentioned, item.get('url_hash', id(item)))
+    for combination, count in co_mentions.combination_counts().items():
+        print(f"Articles mentioning {' and '.join(combination)}: {count}")
+    meeting = sum(count for mask, count in co_mentions.mask_counts.items() if co_mentions.meets_requirements(mask))
+    print(f"Articles meeting the co-mention requirements (at least {NEWS_SEARCH['min_companies_mentioned']} "
+          f"companies, one required combination): {meeting}")
+    
+    # Optionally replace snippets with full article bodies (one pool for all companies)
+    if FULL_TEXT['enabled']:
+        print("Fetching full article text...")
+        attach_full_text([item for company in COMPANY_NAMES for item in combined_news[company]])
+    
+    # Add this run's new articles to the daily topic counters kept across runs
+    topic_store = TopicStore()
+    for company in COMPANY_NAMES:
+        new_count = topic_store.ingest(company, combined_news[company])
+        print(f"{company}: {new_count} new articles added to topic history")
+    
+    # And to the BM25 index, so stored articles can be searched without re-crawling
+    search_index = ArticleIndex()
+    for company in COMPANY_NAMES:
+        search_index.add(combined_news[company], company)
+    search_index.close()
+    
+    # Count terms for every company in one vectorization step, from each article's cached tokens
+    term_matrix = TermMatrix({company: combined_news[company] for company in COMPANY_NAMES},
+                             tokenizer=article_tokens)
+    
+    # Venn diagram data: each company's distinctive topics plus the topics it shares with others,
+    # scored over the report window of the stored daily counts
+    topics = extract_topics(topic_store, since_timestamp)
+    topic_store.close()
+    company_topics = {company: set(topics[company]['distinctive']) | set(topics[company]['shared'])
+                      for company in COMPANY_NAMES}
+    
+    # Generate word clouds
     for company in COMPANY_NAMES:
-        all_text = ' '.join([f"{item['title']} {item['description']}" for item in combined_news[company]])
-        
         # Generate word cloud if we have text
-        wordcloud = generate_word_cloud(all_text, company)
+        wordcloud = generate_word_cloud(term_matrix, company)
         if wordcloud:
             plt.figure(figsize=(10, 5))
             plt.imshow(wordcloud, interpolation='bilinear')
@@ -504,11 +481,11 @@ def generate_report(google_news, newsapi_news):
             plt.title(f'{company} ({len(combined_news[company])} articles)')
             plt.savefig(f'results/wordcloud_{company.replace(" ", "_")}.png')
             plt.close()
-        
-        # Extract topics using simple approach
-        topic_counts = extract_topics(all_text)
-        top_topics = dict(sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:10])
-        company_topics[company] = set(top_topics.keys())
+    
+    # Score every article once; unchanged articles come straight from the on-disk cache
+    all_items = [item for company in COMPANY_NAMES for item in combined_news[company]]
+    for item, score in zip(all_items, cached_polarities(article_text(item) for item in all_items)):
+        item['sentiment'] = score
     
     # Create Venn diagram with topic counts
     venn_sets = [company_topics[company] for company in COMPANY_NAMES]
@@ -766,7 +743,7 @@ def generate_report(google_news, newsapi_news):
         
         # Display latest news
         for i, item in enumerate(combined_news[company][:5]):
-            sentiment = analyze_sentiment(f"{item['title']} {item['description']}")
+            sentiment = item['sentiment']
             
             html_content += f"""
                 <article class="news-item">
@@ -822,7 +799,7 @@ def generate_report(google_news, newsapi_news):
             """
             
             for item in combined_news[company][5:]:
-                sentiment = analyze_sentiment(f"{item['title']} {item['description']}")
+                sentiment = item['sentiment']
                 
                 html_content += f"""
                     <article class="news-item">
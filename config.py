@@ -33,6 +33,36 @@ COMPANY_NAMES = [
     'Vita Nuova'
 ]
 
+# Relevance filtering: name variations that are also ordinary Italian words or
+# phrases only count as a mention when insurance vocabulary appears nearby
+AMBIGUOUS_VARIATIONS = ['Vita Nuova', 'Vita-Nuova', 'Alleanza', 'Unidea']
+
+# Phrases that are not about the company; a name variation inside one does not count as a mention
+RELEVANCE_EXCLUSIONS = {
+    'Vita Nuova': ['nuova vita'],
+    'Alleanza Assicurazioni': ['alleanza atlantica']
+}
+
+# Words that give an ambiguous mention its insurance context
+INSURANCE_CONTEXT_TERMS = [
+    'assicurazioni', 'assicurazione', 'assicurativa', 'assicurativo', 'polizza', 'polizze',
+    'broker', 'finanziaria', 'previdenza', 'risparmio', 'protezione', 'pensione', 'pensioni',
+    'investimento', 'investimenti', 'compagnia', 'generali'
+]
+
+# How far (in characters) around an ambiguous mention to look for insurance context
+RELEVANCE_CONTEXT_CHARS = 200
+
+# Learned relevance filter (python relevance_model.py train); the rules above are used until a model exists
+RELEVANCE_MODEL = {
+    'enabled': False,  # Use the trained model instead of the rules; enable once it is trained on reviewed labels
+    'model_file': 'cache/relevance_model.npz',
+    'labels_file': 'data/relevance_labels.csv',  # company, title, description, relevant (1/0, empty until reviewed)
+    'n_features': 2 ** 18,  # Hashed feature columns
+    'l2': 1.0,  # Regularisation strength
+    'threshold': 0.5  # Minimum probability of relevance
+}
+
 # Required company combinations (at least two must be present)
 REQUIRED_COMBINATIONS = [
     ('Alleanza Assicurazioni', 'Unidea Assicurazioni'),
@@ -48,6 +78,35 @@ NEWS_SEARCH = {
     'country': 'IT'
 }
 
+# Full article text extraction (optional, slower: fetches every matched link)
+FULL_TEXT = {
+    'enabled': False,
+    'max_bytes': 1500000,  # Stop reading a page after this many bytes
+    'per_host': 2,  # Concurrent downloads per site
+    'threads': 16,  # Download threads
+    'processes': None,  # Text extraction processes (None = one per core)
+    'timeout': 15
+}
+
+# Language prefilter run at ingest, before matching, sentiment and topics
+LANGUAGE_FILTER = {
+    'model_file': 'data/language_model.tsv',  # Rebuild with: python language_filter.py train
+    'corpus_dir': 'data/language_corpus',  # <language>.txt training texts for the model
+    'action': 'drop',  # 'drop' other-language items, or only 'tag' them with their language
+    'max_chars': 300,  # Only the start of each item is examined
+    'min_trigrams': 12,  # Shorter texts are not judged (kept)
+    'min_margin': 0.15,  # Required lead of the best language (mean log-probability per trigram)
+    'min_logprob': -8.0  # Texts scoring below this in every language are 'unknown' (dropped like other languages)
+}
+
+# Near-duplicate (syndicated story) detection over title + description shingles
+NEAR_DUPLICATES = {
+    'threshold': 0.5,  # Estimated Jaccard similarity that puts two articles in one cluster
+    'num_perm': 128,  # MinHash signature length
+    'bands': 32,  # LSH bands (num_perm / bands rows each)
+    'shingle_size': 2  # Words per shingle
+}
+
 # Scraping settings
 SCRAPING_DELAY = 3  # seconds between requests
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -58,10 +117,35 @@ LANGUAGE = 'it'  # Italian
 # Sentiment analysis settings
 SENTIMENT_THRESHOLD_POSITIVE = 0.1
 SENTIMENT_THRESHOLD_NEGATIVE = -0.1
+SENTIMENT_MODEL = 'textblob'  # 'textblob' or 'lexicon' (Italian polarity lexicon, much faster)
+SENTIMENT_LEXICON_FILE = 'data/italian_sentiment_lexicon.tsv'
+SENTIMENT_WORKERS = None  # Processes for batch scoring (None = one per core)
+SENTIMENT_CHUNK_SIZE = 256  # Texts sent to a worker at a time
 
 # File settings
 OUTPUT_DIR = 'results'
 REPORT_FILE = 'sentiment_report.html'
+CACHE_DIR = 'cache'
+SENTIMENT_CACHE_FILE = 'cache/sentiment.sqlite'  # Scores by content hash and model version
+URL_INDEX_FILE = 'cache/urls.sqlite'  # Canonical URL hashes of links validated by earlier runs
+URL_VALIDATION_MAX_AGE = 7 * 86400  # Seconds before a validated link is checked again
+TOPIC_STORE_FILE = 'cache/topics.sqlite'  # Per-company, per-day term counts across runs
+TOPIC_MIN_TERM_LENGTH = 4  # Shorter words are never counted as topics
+TOPIC_COUNTING = {
+    'mode': 'exact',  # 'exact' sums every term; 'streaming' tracks only the heaviest ones (multi-year backfills)
+    'capacity': 5000  # Terms kept per company in streaming mode; each count is off by at most total / capacity
+}
+SEARCH_INDEX_FILE = 'cache/search.sqlite'  # BM25 inverted index over every stored article
+SEARCH_INDEX = {
+    'k1': 1.2,  # Term frequency saturation
+    'b': 0.75,  # Document length normalization
+    'field_weights': {'title': 2.0, 'description': 1.0, 'content': 1.0},  # A title word counts twice
+    'max_blocks': 8  # Postings blocks per term before they are merged into one
+}
+STOPWORD_FILES = {  # Same lists as the NLTK stopwords corpus, shipped so no download is needed
+    'italian': 'data/stopwords_italian.txt',
+    'english': 'data/stopwords_english.txt'
+}
 
 # Alternative company names and variations
 COMPANY_VARIATIONS = {
@@ -1,15 +1,19 @@
 import nltk
+from config import STOPWORD_FILES
 
 def download_nltk_data():
-    print("Downloading required NLTK data...")
-    nltk.download('punkt')
-    nltk.download('averaged_perceptron_tagger')
-    nltk.download('wordnet')
-    nltk.download('brown')
-    nltk.download('conll2000')
-    nltk.download('maxent_ne_chunker')
-    nltk.download('words')
-    print("NLTK data downloaded successfully!")
+    """Rebuild the stop word lists shipped in data/ from the NLTK stopwords corpus.
+
+    The scanners read those files directly, so this is only needed to refresh them.
+    """
+    print("Downloading NLTK stopwords...")
+    nltk.download('stopwords')
+    from nltk.corpus import stopwords
+    for language, path in STOPWORD_FILES.items():
+        words = stopwords.words(language)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(words) + '\n')
+        print(f"Wrote {len(words)} {language} stop words to {path}")
 
 if __name__ == "__main__":
-    download_nltk_data() 
\ No newline at end of file
+    download_nltk_data()
@@ -0,0 +1,67 @@
+import heapq
+
+class SpaceSaving:
+    """Approximate top-k counter in fixed memory (Metwally et al.'s Space-Saving).
+
+    At most capacity terms are tracked. When a new term arrives and the table is
+    full, the term with the smallest count is evicted and the newcomer inherits
+    that count as its error. With total = the sum of all weights seen:
+
+    - an estimate never undercounts, and overcounts by at most its error,
+      which is never more than total / capacity;
+    - every term whose true count exceeds total / capacity is in the table;
+    - the order of the top terms is exact whenever the gaps between their
+      counts are larger than the errors.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.heap = []  # (count when pushed, term); entries go stale as counts grow
+        self.total = 0
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, term, weight=1):
+        self.total += weight
+        counts = self.counts
+        if term in counts:
+            counts[term] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[term] = weight
+            self.errors[term] = 0
+            heapq.heappush(self.heap, (weight, term))
+            return
+        # Evict the current minimum, refreshing stale heap entries on the way
+        while True:
+            count, smallest = self.heap[0]
+            if counts[smallest] == count:
+                break
+            heapq.heapreplace(self.heap, (counts[smallest], smallest))
+        del counts[smallest]
+        del self.errors[smallest]
+        counts[term] = count + weight
+        self.errors[term] = count
+        heapq.heapreplace(self.heap, (count + weight, term))
+
+    def update_counts(self, term_counts):
+        """Add (term, count) pairs, e.g. rows streamed from the topic store."""
+        for term, count in term_counts:
+            self.update(term, count)
+
+    @property
+    def max_error(self):
+        """Upper bound on the overcount of any estimate."""
+        return self.total / self.capacity
+
+    def top(self, n=None):
+        """[(term, estimated count, error)] for the n heaviest terms, highest first."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(term, count, self.errors[term]) for term, count in (ranked[:n] if n is not None else ranked)]
+
+    def most_common(self, n=None):
+        """Counter-style [(term, estimated count)]."""
+        return [(term, count) for term, count, _ in self.top(n)]
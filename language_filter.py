@@ -0,0 +1,199 @@
+import glob
+import math
+import os
+import re
+import sys
+from collections import Counter
+import numpy as np
+from config import LANGUAGE, LANGUAGE_FILTER
+from memo import BoundedMemo
+
+# Digits, punctuation and underscores separate words
+NON_LETTERS_RE = re.compile(r'[\W\d_]+')
+
+# Detected language of texts that match none of the model's profiles
+UNKNOWN = 'unknown'
+
+# Distinct words remembered before the word -> row cache is reset
+MAX_CACHED_WORDS = 200000
+
+def words(text, max_chars=None):
+    """Lowercase letter runs from the start of text."""
+    return NON_LETTERS_RE.sub(' ', (text or '')[:max_chars or LANGUAGE_FILTER['max_chars']].lower()).split()
+
+def word_trigrams(word):
+    """Trigrams of a word padded with spaces: "casa" -> " ca", "cas", "asa", "sa "."""
+    padded = f' {word} '
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+class LanguageIdentifier:
+    """Character-trigram naive Bayes language identifier with a compact local model.
+
+    The model file holds one row per frequent trigram with its log-probability
+    in each language; every other trigram gets the language's smoothed
+    "unseen" log-probability.
+    """
+
+    def __init__(self, path=None):
+        path = path or LANGUAGE_FILTER['model_file']
+        self.languages = []
+        rows = []
+        self.index = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if line.startswith('#languages\t'):
+                    self.languages = line.split('\t')[1:]
+                elif line.startswith('#unseen\t'):
+                    rows.insert(0, [float(v) for v in line.split('\t')[1:]])
+                elif line and not line.startswith('#'):
+                    gram, *values = line.split('\t')
+                    self.index[gram] = len(self.index) + 1  # row 0 is "unseen"
+                    rows.append([float(v) for v in values])
+        self.logprobs = np.array(rows)
+        self.word_ids = BoundedMemo(MAX_CACHED_WORDS)
+        self.word_scores = np.zeros((1024, len(self.languages)))
+
+    def _word_rows(self, batch_words):
+        """Row ids of words in self.word_scores, scoring words never seen before."""
+        word_ids = self.word_ids
+        unseen = word_ids.missing(batch_words)
+        if unseen:
+            new_words = list(unseen)
+            get = self.index.get
+            rows = [self.logprobs[[get(g, 0) for g in word_trigrams(w)]].sum(axis=0) for w in new_words]
+            start = len(word_ids)
+            needed = start + len(new_words)
+            if needed > len(self.word_scores):
+                grown = np.zeros((max(needed, 2 * len(self.word_scores)), len(self.languages)))
+                grown[:start] = self.word_scores[:start]
+                self.word_scores = grown
+            self.word_scores[start:needed] = rows
+            word_ids.update(zip(new_words, range(start, needed)))
+        return [word_ids[w] for w in batch_words]
+
+    def scores_many(self, texts):
+        """Mean log-probability per trigram for each language, one row per text.
+
+        Each distinct word is scored once and cached, so a batch costs one
+        dict lookup per word plus a single NumPy reduction.
+        """
+        per_text = [words(text) for text in texts]
+        flat = [w for text_words in per_text for w in text_words]
+        totals = np.zeros((len(texts), len(self.languages)))
+        trigram_counts = np.array([sum(len(w) for w in text_words) for text_words in per_text], dtype=float)
+        if flat:
+            rows = self._word_rows(flat)
+            text_ids = np.repeat(np.arange(len(texts)), [len(text_words) for text_words in per_text])
+            np.add.at(totals, text_ids, self.word_scores[rows])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / trigram_counts[:, None], trigram_counts
+
+    def detect_many(self, texts, language=LANGUAGE):
+        """[(detected language, margin)] for a batch of texts, judged against the target language.
+
+        The result is UNKNOWN when the text fits none of the profiles, or when
+        it is torn between two profiles that are both not the target (e.g. a
+        Romanian headline between es and pt). It is None when the text is too
+        short, or too close to call between the target and another language.
+        """
+        scores, trigram_counts = self.scores_many(texts)
+        results = []
+        if not len(self.languages):
+            return [(None, 0.0) for _ in texts]
+        order = np.argsort(-scores, axis=1)
+        for i in range(len(texts)):
+            if trigram_counts[i] < LANGUAGE_FILTER['min_trigrams']:
+                results.append((None, 0.0))
+                continue
+            best = order[i, 0]
+            runner_up = order[i, 1] if len(self.languages) > 1 else best
+            margin = float(scores[i, best] - scores[i, runner_up]) if runner_up != best else float('inf')
+            if scores[i, best] < LANGUAGE_FILTER['min_logprob']:
+                # Long enough to judge, but unlike every profile: a language the model does not know
+                results.append((UNKNOWN, margin))
+            elif margin >= LANGUAGE_FILTER['min_margin']:
+                results.append((self.languages[best], margin))
+            elif language in (self.languages[best], self.languages[runner_up]):
+                results.append((None, margin))
+            else:
+                results.append((UNKNOWN, margin))
+        return results
+
+    def detect(self, text, language=LANGUAGE):
+        """(detected language, margin over the runner-up); see detect_many."""
+        return self.detect_many([text], language)[0]
+
+def filter_language(articles, identifier=None, text_fn=None, language=LANGUAGE):
+    """Tag each article with 'language' and, unless LANGUAGE_FILTER['action'] is 'tag', drop other languages.
+
+    Returns (kept articles, number dropped).
+    """
+    identifier = identifier or get_identifier()
+    text_fn = text_fn or (lambda a: f"{a.get('title') or ''} {a.get('description') or a.get('desc') or ''}")
+    kept = []
+    detections = identifier.detect_many([text_fn(article) for article in articles], language)
+    for article, (detected, _) in zip(articles, detections):
+        article['language'] = detected
+        if detected is None or detected == language or LANGUAGE_FILTER['action'] == 'tag':
+            kept.append(article)
+    return kept, len(articles) - len(kept)
+
+_identifier = None
+
+def get_identifier():
+    """The shared identifier, loaded on first use."""
+    global _identifier
+    if _identifier is None:
+        _identifier = LanguageIdentifier()
+    return _identifier
+
+def load_corpora(directory=None):
+    """{language: training text} from <language>.txt files, e.g. data/language_corpus/it.txt."""
+    corpora = {}
+    for file_name in sorted(glob.glob(os.path.join(directory or LANGUAGE_FILTER['corpus_dir'], '*.txt'))):
+        with open(file_name, encoding='utf-8') as f:
+            corpora[os.path.splitext(os.path.basename(file_name))[0]] = f.read()
+    return corpora
+
+def train(corpora=None, path=None, top_n=1500):
+    """Build the model file from {language: training text} (default: the shipped corpus): the top_n trigrams of each language."""
+    corpora = corpora or load_corpora()
+    path = path or LANGUAGE_FILTER['model_file']
+    counts = {}
+    for language, text in corpora.items():
+        grams = Counter()
+        for word in words(text, max_chars=len(text)):
+            grams.update(word_trigrams(word))
+        counts[language] = grams
+    kept = set().union(*(set(g for g, _ in c.most_common(top_n)) for c in counts.values()))
+    vocabulary = sorted(kept)
+    languages = list(corpora)
+    columns = {}
+    for language in languages:
+        grams = counts[language]
+        total = sum(grams.values())
+        out_of_vocabulary = [c for g, c in grams.items() if g not in kept]
+        # Add-one smoothing; trigrams outside the model share the mass of the ones left out
+        denominator = total + len(vocabulary) + 1
+        unseen = (sum(out_of_vocabulary) + 1) / denominator / (len(out_of_vocabulary) + 1)
+        columns[language] = ([math.log((grams[g] + 1) / denominator) for g in vocabulary], math.log(unseen))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#languages\t' + '\t'.join(languages) + '\n')
+        f.write('#unseen\t' + '\t'.join(f"{columns[l][1]:.4f}" for l in languages) + '\n')
+        for i, gram in enumerate(vocabulary):
+            f.write(gram + '\t' + '\t'.join(f"{columns[l][0][i]:.4f}" for l in languages) + '\n')
+    print(f"Wrote {len(vocabulary)} trigrams for {', '.join(languages)} to {path}")
+
+if __name__ == "__main__":
+    # python language_filter.py train [it=italian.txt en=english.txt ...]
+    if len(sys.argv) > 1 and sys.argv[1] == 'train':
+        corpora = {}
+        for argument in sys.argv[2:]:
+            language, _, file_name = argument.partition('=')
+            with open(file_name, encoding='utf-8') as f:
+                corpora[language] = f.read()
+        train(corpora)
+    else:
+        print("Usage: python language_filter.py train [it=italian.txt en=english.txt ...]\n"
+              "Without files, the model is rebuilt from " + LANGUAGE_FILTER['corpus_dir'])
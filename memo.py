@@ -0,0 +1,32 @@
+class BoundedMemo(dict):
+    """Dict of compute(key) results that is emptied, rather than grown, once it holds max_size keys.
+
+    memo[key] computes and stores a missing value. Emptying the whole dict is
+    cheaper than tracking which keys were used last, and the words of a news
+    feed repeat enough that the memo refills within a few batches.
+    """
+
+    def __init__(self, max_size, compute=None):
+        super().__init__()
+        self.max_size = max_size
+        self.compute = compute
+
+    def __missing__(self, key):
+        if self.compute is None:
+            raise KeyError(key)
+        if len(self) >= self.max_size:
+            self.clear()
+        value = self[key] = self.compute(key)
+        return value
+
+    def missing(self, keys):
+        """The distinct keys not stored yet, emptying the memo first if they would not all fit.
+
+        For callers that fill in a whole batch at once and need every key of
+        it to stay stored until the batch is done.
+        """
+        unseen = set(keys).difference(self)
+        if len(self) + len(unseen) > self.max_size:
+            self.clear()
+            unseen = set(keys)
+        return unseen
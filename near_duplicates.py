@@ -0,0 +1,116 @@
+import zlib
+import numpy as np
+from config import NEAR_DUPLICATES
+from text_processing import tokenize
+
+# Largest prime below 2**32: a * x + b stays inside uint64 for 32-bit shingle hashes
+MERSENNE_LIKE_PRIME = np.uint64(4294967291)
+
+def duplicate_text(article):
+    """Text compared for near-duplicates: title plus the feed description."""
+    body = article.get('description') or article.get('desc') or ''
+    return f"{article.get('title') or ''} {body}"
+
+def shingles(text, size):
+    """Hashes of the word n-grams of text (the words themselves for very short texts)."""
+    words = tokenize(text)
+    if len(words) <= size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.array(sorted({zlib.crc32(g.encode('utf-8')) for g in grams}), dtype=np.uint64)
+
+class NearDuplicateIndex:
+    """MinHash + LSH index that groups syndicated copies of a story into clusters.
+
+    Each insert hashes the signature into `bands` buckets and only compares it
+    with the cluster representatives found there, so cost per insert does not
+    grow with the number of stories already indexed.
+    """
+
+    def __init__(self, threshold=None, num_perm=None, bands=None, shingle_size=None, seed=1):
+        self.threshold = threshold or NEAR_DUPLICATES['threshold']
+        self.num_perm = num_perm or NEAR_DUPLICATES['num_perm']
+        self.bands = bands or NEAR_DUPLICATES['bands']
+        self.shingle_size = shingle_size or NEAR_DUPLICATES['shingle_size']
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 32 - 5, size=self.num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 2 ** 32 - 5, size=self.num_perm).astype(np.uint64)
+        self.buckets = {}  # (band, band bytes) -> cluster ids
+        self.signatures = []  # cluster id -> representative signature
+        self.clusters = []  # cluster id -> items, representative first
+        self.last_signature = (None, None)  # (text, signature) of the latest lookup
+
+    def signature(self, text):
+        # find() followed by add() for the same text (check, validate, then keep) hashes it once
+        last_text, last_signature = self.last_signature
+        if text == last_text:
+            return last_signature
+        hashes = shingles(text, self.shingle_size)
+        if not len(hashes):
+            signature = None
+        else:
+            permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % MERSENNE_LIKE_PRIME
+            signature = permuted.min(axis=1)
+        self.last_signature = (text, signature)
+        return signature
+
+    def _band_keys(self, signature):
+        return [(band, chunk.tobytes()) for band, chunk in enumerate(np.split(signature, self.bands))]
+
+    def _best_cluster(self, band_keys, signature):
+        best, best_similarity = None, self.threshold
+        for key in band_keys:
+            for cluster_id in self.buckets.get(key, ()):
+                similarity = float(np.mean(self.signatures[cluster_id] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = cluster_id, similarity
+        return best
+
+    def find(self, text):
+        """Representative of the story text belongs to, or None if it is new."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        best = self._best_cluster(self._band_keys(signature), signature)
+        return self.clusters[best][0] if best is not None else None
+
+    def add(self, item, text):
+        """Insert item; return the representative of its cluster (item itself for a new story)."""
+        signature = self.signature(text)
+        if signature is None:
+            self.clusters.append([item])
+            self.signatures.append(None)
+            return item
+
+        band_keys = self._band_keys(signature)
+        best = self._best_cluster(band_keys, signature)
+        if best is not None:
+            self.clusters[best].append(item)
+            return self.clusters[best][0]
+
+        cluster_id = len(self.clusters)
+        self.clusters.append([item])
+        self.signatures.append(signature)
+        for key in band_keys:
+            self.buckets.setdefault(key, []).append(cluster_id)
+        return item
+
+def record_duplicate(representative, article):
+    """List a syndicated copy under the article kept for its story."""
+    representative.setdefault('duplicates', []).append(
+        {'title': article.get('title'), 'link': article.get('link'), 'source': article.get('source')})
+
+def collapse_near_duplicates(articles, text_fn=duplicate_text, index=None):
+    """Keep one article per story; the others are listed under the kept article's 'duplicates'."""
+    index = index or NearDuplicateIndex()
+    representatives = []
+    for article in articles:
+        representative = index.add(article, text_fn(article))
+        if representative is article:
+            representatives.append(article)
+        else:
+            record_duplicate(representative, article)
+    return representatives
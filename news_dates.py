@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import re
+
+# Italian month names as they appear on portal pages ("20 febbraio 2024")
+ITALIAN_MONTHS = {
+    'gennaio': 1, 'febbraio': 2, 'marzo': 3, 'aprile': 4, 'maggio': 5, 'giugno': 6,
+    'luglio': 7, 'agosto': 8, 'settembre': 9, 'ottobre': 10, 'novembre': 11, 'dicembre': 12,
+    'gen': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'mag': 5, 'giu': 6,
+    'lug': 7, 'ago': 8, 'set': 9, 'ott': 10, 'nov': 11, 'dic': 12
+}
+
+ITALIAN_DATE_RE = re.compile(r'(\d{1,2})\s+([a-zà]+)\.?\s+(\d{4})')
+NUMERIC_DATE_RE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})')
+
+ISO_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d'
+]
+
+def _to_utc_epoch(dt):
+    # Naive datetimes carry no offset, so they are read as UTC
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def parse_date(value):
+    """Convert a date from any source into a UTC epoch integer, or None if it cannot be parsed."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return _to_utc_epoch(value)
+    if isinstance(value, (int, float)):
+        # pandas/GoogleNews use NaN for missing dates
+        return int(value) if value == value else None
+
+    text = str(value).strip()
+    if not text or text.lower() in ('nan', 'nat', 'none', 'no date'):
+        return None
+
+    # ISO 8601 (NewsAPI, Trustpilot, CSV exports)
+    iso_text = text[:-1] + '+00:00' if text.endswith('Z') else text
+    for fmt in ISO_FORMATS:
+        try:
+            return _to_utc_epoch(datetime.strptime(iso_text, fmt))
+        except ValueError:
+            continue
+    try:
+        return _to_utc_epoch(datetime.fromisoformat(iso_text))
+    except ValueError:
+        pass
+
+    # RFC 822 (RSS "published" / "pubDate")
+    try:
+        return _to_utc_epoch(parsedate_to_datetime(text))
+    except (TypeError, ValueError, IndexError):
+        pass
+
+    # Italian portal formats: "20 febbraio 2024", "20/02/2024"
+    lowered = text.lower()
+    match = ITALIAN_DATE_RE.search(lowered)
+    if match and match.group(2) in ITALIAN_MONTHS:
+        day, month, year = int(match.group(1)), ITALIAN_MONTHS[match.group(2)], int(match.group(3))
+        try:
+            return _to_utc_epoch(datetime(year, month, day))
+        except ValueError:
+            return None
+    match = NUMERIC_DATE_RE.search(lowered)
+    if match:
+        day, month, year = (int(g) for g in match.groups())
+        try:
+            return _to_utc_epoch(datetime(year, month, day))
+        except ValueError:
+            return None
+
+    return None
+
+def normalize_article_dates(articles, date_key='date'):
+    """Add an integer 'timestamp' to each article and flag the ones whose date could not be parsed.
+
+    Returns the number of articles with unparseable dates.
+    """
+    unparsed = 0
+    for article in articles:
+        if 'timestamp' in article:
+            if article['timestamp'] is None:
+                unparsed += 1
+            continue
+        timestamp = parse_date(article.get(date_key))
+        article['timestamp'] = timestamp
+        article['date_unparsed'] = timestamp is None
+        if timestamp is None:
+            unparsed += 1
+    return unparsed
+
+def sort_by_date(articles, reverse=True):
+    """Sort articles on their integer timestamp, keeping undated articles at the end."""
+    dated = [a for a in articles if a.get('timestamp') is not None]
+    undated = [a for a in articles if a.get('timestamp') is None]
+    dated.sort(key=lambda a: a['timestamp'], reverse=reverse)
+    return dated + undated
+
+def filter_window(articles, since_timestamp, keep_undated=True):
+    """Keep articles published at or after since_timestamp."""
+    return [
+        a for a in articles
+        if (a.get('timestamp') is None and keep_undated)
+        or (a.get('timestamp') is not None and a['timestamp'] >= since_timestamp)
+    ]
+
+def dedupe_articles(articles):
+    """Drop articles with the same title published on the same UTC day."""
+    seen = set()
+    unique = []
+    for article in articles:
+        timestamp = article.get('timestamp')
+        day = timestamp // 86400 if timestamp is not None else None
+        key = ((article.get('title') or '').strip().lower(), day)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(article)
+    return unique
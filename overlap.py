@@ -0,0 +1,148 @@
+import numpy as np
+from config import REQUIRED_COMBINATIONS, NEWS_SEARCH
+
+# Masks are Python ints of any width; vectorized paths split them into 64-bit words
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+# matplotlib_venn's venn3 subset order; character i is membership in set i
+VENN3_REGIONS = ['100', '010', '110', '001', '101', '011', '111']
+
+def region_mask(region_id):
+    """Bitmask of a venn region id such as '101'."""
+    return sum(1 << i for i, bit in enumerate(region_id) if bit == '1')
+
+def mask_words(masks, width):
+    """Masks of up to width bits as a (len(masks), words) uint64 array, lowest word first."""
+    words = max(1, -(-width // WORD_BITS))
+    return np.array([[mask >> (WORD_BITS * w) & WORD_MASK for w in range(words)] for mask in masks],
+                    dtype=np.uint64).reshape(len(masks), words)
+
+def group_by_mask(sets):
+    """Group the items of several sets by membership in one linear pass: {mask: [items]}.
+
+    Bit i of a group's mask is set when its items belong to sets[i].
+    """
+    masks = {}
+    for i, items in enumerate(sets):
+        bit = 1 << i
+        for item in items:
+            masks[item] = masks.get(item, 0) | bit
+    groups = {}
+    for item, mask in masks.items():
+        groups.setdefault(mask, []).append(item)
+    return groups
+
+def venn3_subsets(mask_counts):
+    """Exclusive region sizes for venn3 from {mask: count}."""
+    return tuple(mask_counts.get(region_mask(region), 0) for region in VENN3_REGIONS)
+
+def plot_upset(labels, mask_counts, max_groups=20, title=None):
+    """UpSet-style figure for any number of sets: one bar per membership group,
+    largest first, above a dot matrix showing which sets the group combines."""
+    import matplotlib.pyplot as plt
+    groups = sorted(((mask, count) for mask, count in mask_counts.items() if mask and count),
+                    key=lambda group: (-group[1], group[0]))[:max_groups]
+    x = np.arange(len(groups))
+    fig, (ax_bars, ax_dots) = plt.subplots(
+        2, 1, sharex=True, figsize=(max(6, 0.5 * len(groups) + 3), 4 + 0.35 * len(labels)),
+        gridspec_kw={'height_ratios': [3, max(1, 0.35 * len(labels))]}
+    )
+    ax_bars.bar(x, [count for _, count in groups], color='#404040')
+    for xi, (_, count) in zip(x, groups):
+        ax_bars.text(xi, count, str(count), ha='center', va='bottom', fontsize=8)
+    ax_bars.set_ylabel('Count')
+    ax_bars.spines[['top', 'right']].set_visible(False)
+    if title:
+        ax_bars.set_title(title)
+
+    for row in range(len(labels)):
+        ax_dots.scatter(x, [row] * len(x), color='#dddddd', s=40, zorder=1)
+    for xi, (mask, _) in zip(x, groups):
+        rows = [row for row in range(len(labels)) if mask >> row & 1]
+        ax_dots.plot([xi, xi], [min(rows), max(rows)], color='#1B1B1B', zorder=2)
+        ax_dots.scatter([xi] * len(rows), rows, color='#1B1B1B', s=40, zorder=3)
+    ax_dots.set_yticks(range(len(labels)))
+    ax_dots.set_yticklabels(labels)
+    ax_dots.set_ylim(len(labels) - 0.5, -0.5)
+    ax_dots.set_xticks([])
+    for spine in ax_dots.spines.values():
+        spine.set_visible(False)
+    fig.tight_layout()
+    return fig
+
+class CoMentionCounter:
+    """Company co-mention statistics kept from one bitmask per article.
+
+    Bit i of an article's mask is set when it mentions companies[i]. Articles
+    are folded into a histogram of masks as they arrive, and counts for any
+    combination of companies are one vectorized pass over the distinct masks.
+    Masks are Python ints, split into 64-bit words for the vectorized passes,
+    so any number of companies can be tracked.
+    """
+
+    def __init__(self, companies):
+        self.companies = list(companies)
+        self.bits = {company: 1 << i for i, company in enumerate(self.companies)}
+        self.mask_counts = {}
+        self.article_masks = {}  # article key -> mask it was counted with
+
+    def mask_for(self, companies):
+        """Bitmask of the tracked companies in an iterable of names (others are ignored)."""
+        mask = 0
+        for company in companies:
+            mask |= self.bits.get(company, 0)
+        return mask
+
+    def add(self, mask, count=1):
+        """Fold in count articles with the given mask."""
+        if not mask:
+            return
+        self.mask_counts[mask] = self.mask_counts.get(mask, 0) + count
+
+    def update(self, old_mask, new_mask):
+        """Move one article from old_mask to new_mask (e.g. when another search finds it again)."""
+        if old_mask == new_mask:
+            return
+        if old_mask:
+            self.add(old_mask, -1)
+            if not self.mask_counts[old_mask]:
+                del self.mask_counts[old_mask]
+        self.add(new_mask)
+
+    def tag(self, article, companies, key):
+        """Set article['company_mask'] from the companies it mentions and count it.
+
+        An article seen again under the same key (e.g. found by another
+        company's search) is counted once, with the union of both masks.
+        """
+        old_mask = self.article_masks.get(key, 0)
+        mask = self.mask_for(companies) | old_mask
+        self.article_masks[key] = mask
+        self.update(old_mask, mask)
+        article['company_mask'] = mask
+        return mask
+
+    def histogram(self):
+        """(distinct masks as a (masks, words) uint64 array, article counts) as NumPy arrays."""
+        masks = mask_words(list(self.mask_counts), len(self.companies))
+        counts = np.fromiter(self.mask_counts.values(), dtype=np.int64, count=len(self.mask_counts))
+        return masks, counts
+
+    def meets_requirements(self, mask, combinations=REQUIRED_COMBINATIONS,
+                           min_companies=NEWS_SEARCH['min_companies_mentioned']):
+        """True if mask names at least min_companies companies and contains one required combination."""
+        if bin(mask).count('1') < min_companies:
+            return False
+        required = [self.mask_for(c) for c in combinations]
+        return not required or any(mask & r == r for r in required if r)
+
+    def combination_counts(self, combinations=REQUIRED_COMBINATIONS):
+        """{combination: articles mentioning all of it} for several combinations in one pass."""
+        if not len(combinations):
+            return {}
+        masks, counts = self.histogram()
+        wanted = mask_words([self.mask_for(c) for c in combinations], len(self.companies))
+        hits = ((masks[None, :, :] & wanted[:, None, :]) == wanted[:, None, :]).all(axis=2)
+        totals = hits.astype(np.int64) @ counts
+        return {tuple(c): int(t) for c, t in zip(combinations, totals)}
@@ -0,0 +1,81 @@
+import codecs
+import re
+
+# Only the start of the page is searched for <meta charset>
+META_SNIFF_BYTES = 4096
+
+# Upper bound on the bytes handed to the statistical detector
+DETECT_BYTES = 65536
+
+# Italian pages that are not UTF-8 are almost always Windows-1252 / Latin-1
+FALLBACK_ENCODING = 'cp1252'
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+]
+
+HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+def _known_encoding(name):
+    try:
+        return codecs.lookup(name.decode('ascii') if isinstance(name, bytes) else name).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+def _detect(sample):
+    """Run whichever detector is installed on a bounded sample."""
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(sample).best()
+        return best.encoding if best else None
+    except ImportError:
+        pass
+    try:
+        import chardet
+        return chardet.detect(sample).get('encoding')
+    except ImportError:
+        return None
+
+def decode_content(content, content_type=None):
+    """Decode a page body without scanning all of it.
+
+    Returns (text, path) where path records how the encoding was found:
+    'bom', 'header', 'meta', 'utf-8', 'detector' or 'fallback'.
+    """
+    if not content:
+        return '', 'empty'
+
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return content.decode(encoding, errors='replace'), 'bom'
+
+    match = HEADER_CHARSET_RE.search(content_type or '')
+    encoding = _known_encoding(match.group(1)) if match else None
+    if encoding:
+        return content.decode(encoding, errors='replace'), 'header'
+
+    match = META_CHARSET_RE.search(content[:META_SNIFF_BYTES])
+    encoding = _known_encoding(match.group(1)) if match else None
+    if encoding:
+        return content.decode(encoding, errors='replace'), 'meta'
+
+    # Most undeclared pages are UTF-8, and a strict decode fails fast when they are not
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    encoding = _known_encoding(_detect(content[:DETECT_BYTES]) or '')
+    if encoding:
+        return content.decode(encoding, errors='replace'), 'detector'
+
+    return content.decode(FALLBACK_ENCODING, errors='replace'), 'fallback'
+
+def decode_response(response):
+    """Decode a requests response, avoiding requests' whole-body apparent_encoding guess."""
+    return decode_content(response.content, response.headers.get('Content-Type'))
@@ -0,0 +1,195 @@
+import csv
+import os
+import sys
+import zlib
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+from config import RELEVANCE_MODEL
+from company_matcher import DEFAULT_MATCHER, get_relevance_rule
+from memo import BoundedMemo
+from storage import HISTORY_FILES, read_history
+from text_processing import tokenize
+
+# Distinct features remembered before the feature -> column cache is reset
+MAX_CACHED_FEATURES = 500000
+
+class HashingVectorizer:
+    """Binary features of a (company, title, description) candidate, hashed into n_features columns.
+
+    Features are the words and word pairs of the text, each word again crossed
+    with the company (so one model learns per-company vocabulary) and a bias per
+    company. Column numbers come from crc32, so they are the same in every process.
+    """
+
+    def __init__(self, n_features=None):
+        self.n_features = n_features or RELEVANCE_MODEL['n_features']
+        self.columns = BoundedMemo(MAX_CACHED_FEATURES, self._hash)
+
+    def _hash(self, feature):
+        return zlib.crc32(feature.encode('utf-8')) % self.n_features
+
+    def column(self, feature):
+        return self.columns[feature]
+
+    def candidate_columns(self, company, title, description):
+        column = self.column
+        words = tokenize(f"{title or ''} {description or ''}")
+        salt = column(f'company={company}')
+        columns = {column('bias'), salt}
+        for word in words:
+            word_column = column(word)
+            columns.add(word_column)
+            columns.add((word_column + salt) % self.n_features)
+        for first, second in zip(words, words[1:]):
+            columns.add(column(f'{first} {second}'))
+        return columns
+
+    def transform(self, candidates):
+        """CSR matrix with one row per (company, title, description)."""
+        indices = []
+        indptr = [0]
+        for company, title, description in candidates:
+            indices.extend(self.candidate_columns(company, title, description))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(candidates), self.n_features))
+
+class RelevanceClassifier:
+    """Logistic regression over hashed features; a batch is scored with one sparse matrix-vector product."""
+
+    def __init__(self, weights, threshold=None):
+        self.weights = weights
+        self.threshold = RELEVANCE_MODEL['threshold'] if threshold is None else threshold
+        self.vectorizer = HashingVectorizer(len(weights))
+
+    @classmethod
+    def load(cls, path=None):
+        with np.load(path or RELEVANCE_MODEL['model_file']) as model:
+            return cls(model['weights'])
+
+    def save(self, path=None):
+        path = path or RELEVANCE_MODEL['model_file']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, weights=self.weights)
+
+    def probabilities(self, candidates):
+        """P(relevant) for each (company, title, description)."""
+        if not candidates:
+            return np.empty(0)
+        return 1 / (1 + np.exp(-(self.vectorizer.transform(candidates) @ self.weights)))
+
+    def filter(self, articles, company, title_key='title', description_key='description'):
+        """Batch API: keep the articles of a result list the model finds relevant to company."""
+        probabilities = self.probabilities([(company, a.get(title_key), a.get(description_key)) for a in articles])
+        return [a for a, p in zip(articles, probabilities) if p >= self.threshold]
+
+def fit(matrix, labels, l2=None):
+    """Weights minimising the L2-regularised logistic loss (L-BFGS)."""
+    l2 = RELEVANCE_MODEL['l2'] if l2 is None else l2
+    signs = np.where(np.asarray(labels) > 0, 1.0, -1.0)
+    matrix = matrix.astype(np.float64)
+
+    def loss(weights):
+        margins = signs * (matrix @ weights)
+        gradient = matrix.T @ (-signs / (1 + np.exp(margins))) + l2 * weights
+        return np.logaddexp(0, -margins).sum() + 0.5 * l2 * weights @ weights, gradient
+
+    result = minimize(loss, np.zeros(matrix.shape[1]), jac=True, method='L-BFGS-B')
+    return result.x
+
+def load_labels(paths):
+    """(candidates, labels) from CSV files with company, title, description and relevant (1/0) columns.
+
+    Rows whose 'relevant' column is still empty are skipped.
+    """
+    candidates, labels = [], []
+    for path in paths:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                if row.get('relevant', '').strip() not in ('0', '1'):
+                    continue
+                candidates.append((row['company'], row.get('title') or '', row.get('description') or ''))
+                labels.append(int(row['relevant']))
+    return candidates, labels
+
+def train(label_files=None, path=None, holdout=0.2):
+    """Fit the classifier on the labelled history and save it; reports held-out accuracy against the rules."""
+    candidates, labels = load_labels(label_files or [RELEVANCE_MODEL['labels_file']])
+    if len(set(labels)) < 2:
+        print("Need both relevant and irrelevant examples to train")
+        return None
+    vectorizer = HashingVectorizer()
+    matrix = vectorizer.transform(candidates)
+    labels = np.array(labels)
+
+    order = np.random.default_rng(0).permutation(len(labels))
+    test = order[:int(len(labels) * holdout)]
+    train_rows = order[len(test):]
+    if len(test):
+        model = RelevanceClassifier(fit(matrix[train_rows], labels[train_rows]))
+        predicted = model.probabilities([candidates[i] for i in test]) >= model.threshold
+        rule = np.array([get_relevance_rule(candidates[i][0]).is_relevant(*candidates[i][1:]) for i in test])
+        print(f"Held-out accuracy on {len(test)} examples: model {np.mean(predicted == labels[test]):.3f}, "
+              f"rules {np.mean(rule == labels[test]):.3f}")
+
+    model = RelevanceClassifier(fit(matrix, labels))
+    model.save(path)
+    print(f"Trained on {len(labels)} examples ({labels.sum()} relevant), saved to {path or RELEVANCE_MODEL['model_file']}")
+    return model
+
+def export_candidates(patterns=HISTORY_FILES, path=None):
+    """Append company mentions from past CSV exports to the labels file with an empty 'relevant' column.
+
+    The labels are left for a person to fill in: pre-labelling with the rules
+    would only teach the model to copy them.
+    """
+    path = path or RELEVANCE_MODEL['labels_file']
+    seen = set()
+    if os.path.exists(path):
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            seen.update((row['company'], row.get('title') or '') for row in csv.DictReader(f))
+    rows = []
+    for history in read_history(patterns):
+        for row in history:
+            title = row.get('title') or ''
+            description = ' '.join((row.get('description') or row.get('content') or '').split())[:300]
+            for company in DEFAULT_MATCHER.mentions(f"{title} {description}"):
+                if (company, title) not in seen:
+                    seen.add((company, title))
+                    rows.append([company, title, description, ''])
+    new_file = not os.path.exists(path)
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(['company', 'title', 'description', 'relevant'])
+        writer.writerows(rows)
+    print(f"Added {len(rows)} unlabelled candidates to {path}; fill in the 'relevant' column (1/0) before training")
+    return len(rows)
+
+_classifier = None
+
+def get_relevance_classifier():
+    """The trained classifier when RELEVANCE_MODEL is enabled and a model file exists, else None."""
+    global _classifier
+    if _classifier is None and RELEVANCE_MODEL['enabled'] and os.path.exists(RELEVANCE_MODEL['model_file']):
+        _classifier = RelevanceClassifier.load()
+    return _classifier
+
+def filter_relevant_articles(articles, company, title_key='title', description_key='description'):
+    """Keep the articles in a result list that are really about company (learned model if enabled, else the rules)."""
+    classifier = get_relevance_classifier()
+    if classifier is not None:
+        return classifier.filter(articles, company, title_key, description_key)
+    return get_relevance_rule(company).filter(articles, title_key, description_key)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'train':
+        train(sys.argv[2:] or None)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'export':
+        export_candidates(sys.argv[2:] or HISTORY_FILES)
+    else:
+        print("Usage: python relevance_model.py export [csv files/patterns ...]\n"
+              "       python relevance_model.py train [label csv files ...]")
@@ -0,0 +1,236 @@
+import math
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter, defaultdict
+import numpy as np
+from config import SEARCH_INDEX_FILE, SEARCH_INDEX
+from news_dates import parse_date
+from storage import HISTORY_FILES, read_history, select_in
+from text_processing import tokenize
+from topic_store import TopicStore
+
+# Indexed fields; their weights come from SEARCH_INDEX['field_weights']
+FIELDS = ('title', 'description', 'content')
+
+def field_text(article, field):
+    if field == 'description':
+        return article.get('description') or article.get('desc') or ''
+    return article.get(field) or ''
+
+class ArticleIndex:
+    """On-disk inverted index of articles with BM25 ranking.
+
+    Each article is indexed once, with the set of companies it was found for,
+    so a search can be limited to one company. Every add() writes one block of
+    postings per term: the doc ids and field-weighted term frequencies of the
+    new articles, stored as packed NumPy arrays. A query reads a handful of
+    blocks per query term and scores them in a few vectorized operations, so
+    its cost depends on how many articles contain the query terms, not on the
+    size of the collection. Terms with more than max_blocks blocks are merged
+    into one as they are updated.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_FILE, k1=SEARCH_INDEX['k1'], b=SEARCH_INDEX['b'],
+                 field_weights=None, max_blocks=SEARCH_INDEX['max_blocks']):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or SEARCH_INDEX['field_weights']
+        self.max_blocks = max_blocks
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        tables = {name for name, in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            'doc_id INTEGER PRIMARY KEY, article_key INTEGER NOT NULL UNIQUE, '
+            'title TEXT, link TEXT, timestamp INTEGER, length REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS document_companies ('
+            'doc_id INTEGER NOT NULL, company TEXT NOT NULL, PRIMARY KEY (doc_id, company)) WITHOUT ROWID;'
+            'CREATE INDEX IF NOT EXISTS document_companies_company ON document_companies (company);'
+            'CREATE TABLE IF NOT EXISTS postings ('
+            'term TEXT NOT NULL, block INTEGER NOT NULL, doc_ids BLOB NOT NULL, weights BLOB NOT NULL, '
+            'PRIMARY KEY (term, block)) WITHOUT ROWID;'
+        )
+        if 'documents' in tables and 'document_companies' not in tables:
+            # Indexes from before the company set kept one company per article in documents.company
+            self.connection.execute(
+                "INSERT OR IGNORE INTO document_companies SELECT doc_id, company FROM documents "
+                "WHERE company IS NOT NULL AND company != ''")
+        self.connection.commit()
+        self.lengths = None  # doc_id -> weighted length, loaded on the first query
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def term_weights(self, article):
+        """{term: field-weighted frequency} of an article."""
+        weights = Counter()
+        for field in FIELDS:
+            weight = self.field_weights.get(field, 0)
+            if weight:
+                for term in tokenize(field_text(article, field)):
+                    weights[term] += weight
+        return weights
+
+    def add(self, articles, company=None):
+        """Index the articles not indexed before and record them under company; returns how many were new.
+
+        Without company, each article's own 'company' field (if any) is used.
+        """
+        keys = {}
+        companies = defaultdict(set)
+        for article in articles:
+            key = TopicStore.article_key(article)
+            keys.setdefault(key, article)
+            article_company = company or article.get('company')
+            if article_company:
+                companies[key].add(article_company)
+        known = dict(select_in(self.connection,
+                               'SELECT article_key, doc_id FROM documents WHERE article_key IN ({placeholders})', keys))
+
+        first_id = self.connection.execute('SELECT COALESCE(MAX(doc_id), 0) + 1 FROM documents').fetchone()[0]
+        doc_id = first_id
+        documents = []
+        postings = defaultdict(lambda: ([], []))
+        for key, article in keys.items():
+            if key in known:
+                continue
+            weights = self.term_weights(article)
+            for term, weight in weights.items():
+                ids, values = postings[term]
+                ids.append(doc_id)
+                values.append(weight)
+            documents.append((doc_id, key, article.get('title') or '',
+                              article.get('link') or article.get('url') or '', article.get('timestamp'),
+                              float(sum(weights.values()))))
+            known[key] = doc_id
+            doc_id += 1
+
+        memberships = [(known[key], name) for key, names in companies.items() for name in names]
+        if memberships:
+            # An article already indexed for another company only gains a company
+            self.connection.executemany('INSERT OR IGNORE INTO document_companies VALUES (?, ?)', memberships)
+        if documents:
+            # The batch's first doc id numbers its blocks, so blocks stay in doc id order
+            self.connection.executemany(
+                'INSERT INTO documents (doc_id, article_key, title, link, timestamp, length) VALUES (?, ?, ?, ?, ?, ?)',
+                documents)
+            self.connection.executemany(
+                'INSERT INTO postings (term, block, doc_ids, weights) VALUES (?, ?, ?, ?)',
+                [(term, first_id, np.array(ids, dtype=np.int32).tobytes(), np.array(values, dtype=np.float32).tobytes())
+                 for term, (ids, values) in postings.items()]
+            )
+            self._merge_blocks(list(postings))
+            self.lengths = None
+        if documents or memberships:
+            self.connection.commit()
+        return len(documents)
+
+    def _merge_blocks(self, terms):
+        """Rewrite the postings of terms with more than max_blocks blocks as a single block."""
+        crowded = [term for term, blocks in select_in(
+            self.connection, 'SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term', terms)
+            if blocks > self.max_blocks]
+        for term in crowded:
+            blocks = self.connection.execute(
+                'SELECT block, doc_ids, weights FROM postings WHERE term = ? ORDER BY block', (term,)).fetchall()
+            self.connection.execute('DELETE FROM postings WHERE term = ?', (term,))
+            self.connection.execute(
+                'INSERT INTO postings (term, block, doc_ids, weights) VALUES (?, ?, ?, ?)',
+                (term, blocks[0][0], b''.join(row[1] for row in blocks), b''.join(row[2] for row in blocks)))
+
+    def _doc_lengths(self):
+        """Weighted length of every document, indexed by doc id (reloaded after the index changes)."""
+        max_id = self.connection.execute('SELECT COALESCE(MAX(doc_id), 0) FROM documents').fetchone()[0]
+        if self.lengths is None or len(self.lengths) != max_id + 1:
+            self.lengths = np.zeros(max_id + 1, dtype=np.float32)
+            for doc_id, length in self.connection.execute('SELECT doc_id, length FROM documents'):
+                self.lengths[doc_id] = length
+            self.average_length = float(self.lengths[1:].mean()) if max_id else 0.0
+        return self.lengths
+
+    def postings(self, term):
+        """(doc ids, weighted term frequencies) of every document containing term."""
+        rows = self.connection.execute('SELECT doc_ids, weights FROM postings WHERE term = ?', (term,)).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        return (np.frombuffer(b''.join(row[0] for row in rows), dtype=np.int32),
+                np.frombuffer(b''.join(row[1] for row in rows), dtype=np.float32))
+
+    def search(self, query, n=10, company=None):
+        """The n best BM25 matches for query as dicts (doc_id, score, companies, title, link, timestamp).
+
+        With company, only articles found for that company are returned.
+        """
+        lengths = self._doc_lengths()
+        document_count = len(lengths) - 1
+        if not document_count:
+            return []
+        scores = np.zeros(len(lengths), dtype=np.float32)
+        for term, query_count in Counter(tokenize(query)).items():
+            doc_ids, tf = self.postings(term)
+            if not len(doc_ids):
+                continue
+            idf = math.log(1 + (document_count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[doc_ids] / self.average_length)
+            scores[doc_ids] += query_count * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if company is not None:
+            allowed = np.fromiter((doc_id for doc_id, in self.connection.execute(
+                'SELECT doc_id FROM document_companies WHERE company = ?', (company,))), dtype=np.int64)
+            matched = matched[np.isin(matched, allowed)]
+        if len(matched) > n:
+            matched = matched[np.argpartition(scores[matched], -n)[-n:]]
+        matched = matched[np.argsort(-scores[matched], kind='stable')]
+        if not len(matched):
+            return []
+        placeholders = ','.join('?' * len(matched))
+        doc_ids = [int(doc_id) for doc_id in matched]
+        rows = {row[0]: row for row in self.connection.execute(
+            f'SELECT doc_id, title, link, timestamp FROM documents WHERE doc_id IN ({placeholders})', doc_ids)}
+        companies = defaultdict(list)
+        for doc_id, name in self.connection.execute(
+                f'SELECT doc_id, company FROM document_companies WHERE doc_id IN ({placeholders})', doc_ids):
+            companies[doc_id].append(name)
+        return [{'doc_id': doc_id, 'score': float(scores[doc_id]), 'companies': companies[doc_id],
+                 'title': rows[doc_id][1], 'link': rows[doc_id][2], 'timestamp': rows[doc_id][3]}
+                for doc_id in doc_ids]
+
+    def close(self):
+        self.connection.close()
+
+def index_history(patterns=HISTORY_FILES, index=None):
+    """Add the articles stored in past CSV exports (title, content, url, date) to the index."""
+    index = index if index is not None else ArticleIndex()
+    added = 0
+    for articles in read_history(patterns):
+        for row in articles:
+            row['link'] = row.get('url') or ''
+            row['timestamp'] = parse_date(row.get('date'))
+        added += index.add(articles)
+    print(f"Indexed {added} new articles ({len(index)} in total)")
+    return added
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'add':
+        index_history(sys.argv[2:] or HISTORY_FILES)
+    elif len(sys.argv) > 2 and sys.argv[1] == 'search':
+        words = sys.argv[2:]
+        company = None
+        if words[0] == '--company' and len(words) > 2:
+            company, words = words[1], words[2:]
+        index = ArticleIndex()
+        start = time.perf_counter()
+        results = index.search(' '.join(words), company=company)
+        elapsed = time.perf_counter() - start
+        for result in results:
+            print(f"{result['score']:7.2f}  {result['title'][:80]}  {result['link']}")
+        print(f"{len(results)} results in {elapsed * 1000:.1f} ms over {len(index)} articles")
+    else:
+        print("Usage: python search_index.py add [csv files/patterns ...]\n"
+              "       python search_index.py search [--company NAME] <query>")
@@ -0,0 +1,196 @@
+import hashlib
+import itertools
+import os
+import sqlite3
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from config import (SENTIMENT_CACHE_FILE, SENTIMENT_WORKERS, SENTIMENT_CHUNK_SIZE,
+                    SENTIMENT_MODEL, SENTIMENT_LEXICON_FILE)
+from storage import HISTORY_FILES, read_history, select_in
+from text_processing import article_text, text_key
+
+# Model version of scores loaded from CSV exports, which do not record the TextBlob release that produced them
+IMPORTED_VERSION = 'imported'
+
+def textblob_polarity(text):
+    """TextBlob polarity in [-1, 1]."""
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+def textblob_version():
+    """Model version of TextBlob scores; recent releases no longer define textblob.__version__."""
+    from importlib.metadata import version
+    return f"textblob-{version('textblob')}"
+
+_lexicon_scorer = None
+
+def lexicon_scorer():
+    """The Italian lexicon scorer, loaded on first use."""
+    global _lexicon_scorer
+    if _lexicon_scorer is None:
+        from sentiment_lexicon import LexiconScorer
+        _lexicon_scorer = LexiconScorer(SENTIMENT_LEXICON_FILE)
+    return _lexicon_scorer
+
+def lexicon_version(path=SENTIMENT_LEXICON_FILE):
+    """Model version that changes whenever the lexicon file is edited."""
+    with open(path, 'rb') as f:
+        return f"lexicon-{hashlib.sha1(f.read()).hexdigest()[:12]}"
+
+def _score_chunk(scorer, texts):
+    return [scorer(text) for text in texts]
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def score_texts(texts, scorer=textblob_polarity, workers=None, chunk_size=SENTIMENT_CHUNK_SIZE):
+    """Stream scores for an iterable of texts, in order, from a pool of worker processes.
+
+    Texts are sent in chunks of chunk_size and only a few chunks per worker are
+    in flight at once, so arbitrarily long backlogs are scored in bounded memory.
+    scorer must be a module-level function so it can be sent to the workers.
+    """
+    workers = workers or SENTIMENT_WORKERS or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(texts, chunk_size):
+            yield from _score_chunk(scorer, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(texts, chunk_size):
+            pending.append(pool.submit(_score_chunk, scorer, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+class SentimentCache:
+    """Sentiment scores on disk, keyed by content hash and model version.
+
+    Texts this model has not scored are looked up under fallback_version, if
+    given, before they are scored; new scores are always stored under
+    model_version.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_FILE, model_version=None, fallback_version=None):
+        self.path = path
+        self.model_version = model_version or textblob_version()
+        self.fallback_version = fallback_version
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS sentiment ('
+            'text_hash TEXT NOT NULL, model TEXT NOT NULL, score REAL NOT NULL, '
+            'PRIMARY KEY (text_hash, model))'
+        )
+        self.connection.commit()
+
+    def _get_version(self, keys, model_version):
+        return dict(select_in(
+            self.connection, 'SELECT text_hash, score FROM sentiment WHERE model = ? AND text_hash IN ({placeholders})',
+            keys, (model_version,)))
+
+    def get_many(self, keys):
+        """Return {key: score} for the keys already scored by this model (or the fallback version)."""
+        keys = list(keys)
+        found = self._get_version(keys, self.model_version)
+        if self.fallback_version and len(found) < len(keys):
+            found.update(self._get_version([key for key in keys if key not in found], self.fallback_version))
+        return found
+
+    def set_many(self, scores):
+        """Store {key: score} for this model."""
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO sentiment (text_hash, model, score) VALUES (?, ?, ?)',
+            [(key, self.model_version, float(score)) for key, score in scores.items()]
+        )
+        self.connection.commit()
+
+    def score_many(self, texts, scorer=textblob_polarity, workers=None, batch_scorer=None):
+        """Scores for texts in order, computing only the ones never scored before.
+
+        batch_scorer, when given, rates all unscored texts in one call; otherwise
+        large backlogs of unscored texts are spread across worker processes.
+        """
+        texts = list(texts)
+        keys = [text_key(text) for text in texts]
+        scores = self.get_many(set(keys))
+        unscored = {}
+        for key, text in zip(keys, texts):
+            if key not in scores and key not in unscored:
+                unscored[key] = text
+        if batch_scorer:
+            missing = dict(zip(unscored, map(float, batch_scorer(list(unscored.values()))))) if unscored else {}
+        else:
+            if len(unscored) < SENTIMENT_CHUNK_SIZE * 2:
+                workers = 1
+            missing = dict(zip(unscored, score_texts(unscored.values(), scorer, workers)))
+        if missing:
+            self.set_many(missing)
+            scores.update(missing)
+        return [scores[key] for key in keys]
+
+    def score(self, text, scorer=textblob_polarity, batch_scorer=None):
+        return self.score_many([text], scorer, batch_scorer=batch_scorer)[0]
+
+    def close(self):
+        self.connection.close()
+
+_default_cache = None
+
+def get_cache():
+    """The process-wide cache for SENTIMENT_MODEL, opened on first use."""
+    global _default_cache
+    if _default_cache is None:
+        if SENTIMENT_MODEL == 'lexicon':
+            _default_cache = SentimentCache(model_version=lexicon_version())
+        else:
+            # Past exports were scored with TextBlob too, of some earlier release
+            _default_cache = SentimentCache(fallback_version=IMPORTED_VERSION)
+    return _default_cache
+
+def _batch_scorer():
+    return lexicon_scorer().score_batch if SENTIMENT_MODEL == 'lexicon' else None
+
+def cached_polarity(text):
+    """Polarity from SENTIMENT_MODEL, read from the cache when this text was scored before."""
+    return get_cache().score(text, batch_scorer=_batch_scorer())
+
+def cached_polarities(texts, workers=None):
+    """Batch form of cached_polarity."""
+    return get_cache().score_many(texts, workers=workers, batch_scorer=_batch_scorer())
+
+def warm_cache_from_history(patterns=HISTORY_FILES, cache=None):
+    """Load the scores stored in past CSV exports (title, content, sentiment_score) into the cache.
+
+    The exports do not say which TextBlob release scored them, so the scores
+    are stored under IMPORTED_VERSION: the TextBlob cache reads them only for
+    texts the installed release has not scored, and the lexicon model never does.
+    """
+    cache = cache or SentimentCache(model_version=IMPORTED_VERSION)
+    scores = {}
+    for rows in read_history(patterns):
+        for row in rows:
+            try:
+                scores[text_key(article_text(row))] = float(row['sentiment_score'])
+            except (KeyError, TypeError, ValueError):
+                continue
+    if scores:
+        cache.set_many(scores)
+    print(f"Warmed sentiment cache with {len(scores)} scores")
+    return len(scores)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'warm':
+        warm_cache_from_history(sys.argv[2:] or HISTORY_FILES)
+    else:
+        print("Usage: python sentiment.py warm [csv files/patterns ...]")
@@ -0,0 +1,96 @@
+import numpy as np
+from config import SENTIMENT_LEXICON_FILE
+from memo import BoundedMemo
+
+# Placed between documents when a batch is joined into one string
+DOCUMENT_SEPARATOR = '\x00'
+
+# Characters stripped from the ends of a token before lexicon lookup
+TOKEN_PUNCTUATION = '.,;:!?()[]{}"«»“”‘’\'-–—…/*#@%&+=<>|'
+
+# Distinct tokens remembered before the token -> term map is reset
+MAX_CACHED_TOKENS = 500000
+
+# Reserved token ids (lexicon terms start at 1)
+NO_TERM, NEGATION, SEPARATOR = 0, -1, -2
+
+def load_lexicon(path=SENTIMENT_LEXICON_FILE):
+    """Read term<TAB>score lines; a trailing * marks a stem that matches any ending."""
+    entries = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            term, score = line.split('\t')
+            is_stem = term.endswith('*')
+            entries[term.rstrip('*').lower()] = (float(score), is_stem)
+    return entries
+
+class LexiconScorer:
+    """Italian polarity scorer that rates a whole batch of documents in one call.
+
+    The batch is joined and split into tokens once. Each token is mapped to a
+    lexicon id through a memo dict, so only the first sighting of a word
+    resolves stems. The rest is NumPy: a cumulative sum assigns tokens to
+    documents, and np.bincount gives each document the mean polarity of its
+    lexicon hits, in [-1, 1]. "non" directly before a term flips its sign.
+    """
+
+    def __init__(self, path=SENTIMENT_LEXICON_FILE):
+        entries = load_lexicon(path)
+        terms = list(entries)
+        self.exact = {t: i + 1 for i, t in enumerate(terms) if not entries[t][1]}
+        self.stems = {t: i + 1 for i, t in enumerate(terms) if entries[t][1]}
+        self.stem_lengths = sorted({len(t) for t in self.stems}, reverse=True)
+        # Index 0 is "no term" and scores nothing
+        self.polarity = np.array([0.0] + [entries[t][0] for t in terms])
+        self.token_ids = BoundedMemo(MAX_CACHED_TOKENS, self._resolve)
+
+    def _resolve(self, token):
+        """Lexicon id for a raw token (slow path, once per distinct token)."""
+        if token == DOCUMENT_SEPARATOR:
+            return SEPARATOR
+        word = token.strip(TOKEN_PUNCTUATION)
+        # Elided articles: "dell'ottimo" -> "ottimo"
+        for apostrophe in ("'", '’'):
+            if apostrophe in word:
+                word = word.rsplit(apostrophe, 1)[1]
+        if word == 'non':
+            return NEGATION
+        term_id = self.exact.get(word)
+        if term_id:
+            return term_id
+        for length in self.stem_lengths:
+            if len(word) >= length:
+                term_id = self.stems.get(word[:length])
+                if term_id:
+                    return term_id
+        return NO_TERM
+
+    def score_batch(self, texts):
+        """Polarity for every text, as a NumPy array in input order."""
+        texts = [(text or '').replace(DOCUMENT_SEPARATOR, ' ') for text in texts]
+        count = len(texts)
+        if not count:
+            return np.zeros(0)
+        tokens = f' {DOCUMENT_SEPARATOR} '.join(texts).lower().split()
+        if not tokens:
+            return np.zeros(count)
+
+        ids = np.fromiter(map(self.token_ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+        documents = np.cumsum(ids == SEPARATOR)
+        hits = ids > 0
+        signs = np.ones(len(ids))
+        negated = np.zeros(len(ids), dtype=bool)
+        negated[1:] = ids[:-1] == NEGATION
+        signs[negated] = -1.0
+
+        weights = self.polarity[ids[hits]] * signs[hits]
+        totals = np.bincount(documents[hits], weights=weights, minlength=count)
+        hit_counts = np.bincount(documents[hits], minlength=count)
+        return np.divide(totals, hit_counts, out=np.zeros(count), where=hit_counts > 0)
+
+    def score(self, text):
+        return float(self.score_batch([text])[0])
@@ -10,15 +10,26 @@ import matplotlib.pyplot as plt
 import matplotlib_venn
 from matplotlib_venn import venn3
 import io
+import itertools
 import base64
 from textblob import TextBlob
 from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 import time
 import random
-from config import TARGET_URLS, COMPANY_VARIATIONS
+from config import TARGET_URLS, COMPANY_VARIATIONS, FULL_TEXT
+from news_dates import normalize_article_dates, sort_by_date
+from article_fetcher import ArticleFetcher, attach_full_text
+from page_decoding import decode_response
+from company_matcher import build_default_matcher
+from topic_index import TopicIndex
+from term_matrix import TermMatrix
+from near_duplicates import NearDuplicateIndex, duplicate_text, record_duplicate
+from url_index import UrlIndex, open_validated_urls, url_hash
+from topic_store import TopicStore
+from search_index import ArticleIndex
+from overlap import CoMentionCounter, venn3_subsets, plot_upset
+from text_processing import prepare_articles, article_tokens, load_stop_words
+from language_filter import filter_language
 import feedparser
 
 class NewsScanner:
@@ -39,13 +50,31 @@ class NewsScanner:
             "Alleanza Assicurazioni"
         ]
         self.article_counts = {}
+        self.page_encodings = {}  # url -> how its charset was found
         self.word_clouds = {}
         self.top_topics = {}
         self.articles = {}
+        # Shared by every company's search, so its download threads and extraction processes start once per run
+        self.fetcher = ArticleFetcher()
         
         # Load company variations from config
         self.company_variations = COMPANY_VARIATIONS
         
+        # One automaton for every company variation and keyword
+        self.matcher = build_default_matcher(self.companies)
+        
+        # Topic table compiled once into a term -> categories index
+        self.topic_index = TopicIndex()
+        
+        # Company bitmask per article (by canonical link) and the co-mention counts built from them
+        self.co_mentions = CoMentionCounter(self.companies)
+        
+        # Feed and search items dropped by the language prefilter
+        self.other_language_count = 0
+        
+        # Links found reachable by this or an earlier run are not checked again
+        self.validated_urls = open_validated_urls()
+        
         # RSS feeds and direct URLs
         self.news_sources = {
             'assinews': {
@@ -76,34 +105,47 @@ class NewsScanner:
         # Initialize feedparser with user agent
         feedparser.USER_AGENT = random.choice(self.user_agents)
         
-        # Download required NLTK data
-        try:
-            nltk.data.find('tokenizers/punkt')
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('punkt')
-            nltk.download('stopwords')
-        
-        # Combine Italian and English stopwords
-        self.stop_words = set(stopwords.words('italian') + stopwords.words('english'))
-        self.stop_words.update([
+        # Extra stop words; the Italian and English lists are loaded on first use
+        self.extra_stop_words = {
             'della', 'delle', 'degli', 'dell', 'dal', 'dalla', 'dai', 'dagli', 
             'del', 'alla', 'alle', 'agli', 'allo', 'nell', 'nella', 'nelle', 
             'negli', 'sul', 'sulla', 'sulle', 'sugli', 'con', 'per', 'tra',
             'fra', 'presso', 'dopo', 'prima', 'durante', 'oltre', 'attraverso',
             'mediante', 'tramite', 'verso', 'fino', 'assicurazioni', 'assicurazione',
             'company', 'companies', 'group', 'gruppo', 'società'
-        ])
+        }
+        self._stop_words = None
+
+    @property
+    def stop_words(self):
+        """Italian and English stop words plus the scanner's own, built on first use."""
+        if self._stop_words is None:
+            self._stop_words = load_stop_words('italian') | load_stop_words('english') | self.extra_stop_words
+        return self._stop_words
 
     def fetch_rss_feed(self, feed_url):
         """Fetch and parse an RSS feed."""
         try:
             feed = feedparser.parse(feed_url)
-            return feed.entries
+            return self.keep_target_language(feed.entries)
         except Exception as e:
             print(f"    Error fetching RSS feed: {str(e)}")
             return []
 
+    def keep_target_language(self, items):
+        """Drop feed or search items in another language before they are matched and validated."""
+        kept, dropped = filter_language(items)
+        if dropped:
+            print(f"    Skipped {dropped} items in other languages")
+            self.other_language_count += dropped
+        return kept
+
+    def decode_page(self, response):
+        """Decode a fetched page and remember which charset path it took."""
+        text, path = decode_response(response)
+        self.page_encodings[response.url] = path
+        return text
+
     def scrape_search_page(self, url, company):
         """Scrape a website's search results page with retry logic."""
         max_retries = 3
@@ -129,7 +171,7 @@ class NewsScanner:
                 
                 # Handle different status codes
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = BeautifulSoup(self.decode_page(response), 'html.parser')
                     results = []
                     
                     # Common article selectors
@@ -168,7 +210,7 @@ class NewsScanner:
                                         })
                     
                     if results:
-                        return results
+                        return self.keep_target_language(results)
                     continue  # Try next selector if no results
                     
                 elif response.status_code in [429, 503, 520]:  # Rate limit or service unavailable
@@ -212,10 +254,11 @@ class NewsScanner:
         print(f'\nSearching news for {company}...')
         verified_results = []
         seen_titles = set()
+        seen_urls = UrlIndex()  # canonical links, so tracking variants count once
+        stories = NearDuplicateIndex()  # syndicated copies of a story are validated once
         
-        # Get company variations
-        variations = self.company_variations.get(company, [company])
-        variations.append(company)  # Add the original name
+        # Get company variations (used as search queries)
+        variations = self.company_variations.get(company, []) + [company]
         
         # Special handling for Alleanza Assicurazioni press releases
         if company == "Alleanza Assicurazioni":
@@ -224,7 +267,7 @@ class NewsScanner:
                 headers = {'User-Agent': random.choice(self.user_agents)}
                 response = requests.get(self.news_sources['alleanza']['press'], headers=headers)
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = BeautifulSoup(self.decode_page(response), 'html.parser')
                     press_items = soup.select('.press-item, .news-item, article')
                     
                     for item in press_items:
@@ -237,7 +280,7 @@ class NewsScanner:
                             link = link_elem.get('href', '')
                             desc = desc_elem.get_text().strip() if desc_elem else ''
                             
-                            if title and link and title not in seen_titles:
+                            if title and link and title not in seen_titles and link not in seen_urls and not self.is_syndicated_copy(stories, title, desc, link):
                                 verified_results.append({
                                     'title': title,
                                     'link': link,
@@ -245,6 +288,8 @@ class NewsScanner:
                                     'date': ''
                                 })
                                 seen_titles.add(title)
+                                seen_urls.add(link)
+                                stories.add(verified_results[-1], duplicate_text(verified_results[-1]))
             except Exception as e:
                 print(f"    Error fetching press releases: {str(e)}")
         
@@ -260,9 +305,8 @@ class NewsScanner:
                     desc = entry.get('description', '')
                     
                     # Check if article mentions any company variation
-                    if any(var.lower() in title.lower() or var.lower() in desc.lower() 
-                          for var in variations):
-                        if title and link and title not in seen_titles:
+                    if company in self.matcher.match(f"{title} {desc}").companies:
+                        if title and link and title not in seen_titles and link not in seen_urls and not self.is_syndicated_copy(stories, title, desc, link):
                             if self.validate_link(link):
                                 verified_results.append({
                                     'title': title,
@@ -271,6 +315,8 @@ class NewsScanner:
                                     'date': entry.get('published', '')
                                 })
                                 seen_titles.add(title)
+                                seen_urls.add(link)
+                                stories.add(verified_results[-1], duplicate_text(verified_results[-1]))
                                 print(f"    ✓ Found article: {title[:50]}...")
             
             # Then try search pages
@@ -286,7 +332,7 @@ class NewsScanner:
                         link = result.get('link')
                         desc = result.get('desc', '')
                         
-                        if title and link and title not in seen_titles:
+                        if title and link and title not in seen_titles and link not in seen_urls and not self.is_syndicated_copy(stories, title, desc, link):
                             if self.validate_link(link):
                                 verified_results.append({
                                     'title': title,
@@ -295,6 +341,8 @@ class NewsScanner:
                                     'date': ''
                                 })
                                 seen_titles.add(title)
+                                seen_urls.add(link)
+                                stories.add(verified_results[-1], duplicate_text(verified_results[-1]))
                                 print(f"    ✓ Found article: {title[:50]}...")
                     
                     if len(verified_results) >= 5:
@@ -303,215 +351,120 @@ class NewsScanner:
                 if len(verified_results) >= 5:
                     break
         
+        for article in verified_results:
+            self.tag_article(article, company)
+        
+        # Normalize dates once so previews show the latest articles first
+        unparsed = normalize_article_dates(verified_results)
+        prepare_articles(verified_results)
+        verified_results = sort_by_date(verified_results)
+        
         actual_count = len(verified_results)
-        print(f'  Found {actual_count} valid articles')
+        print(f'  Found {actual_count} valid articles ({unparsed} with unparseable dates)')
         
         # Store article count and results
         self.article_counts[company] = actual_count
         self.articles[company] = verified_results
         
-        # Extract texts for topic analysis
-        texts = [f"{r['title']} {r.get('desc', '')}" for r in verified_results]
-        
-        if texts:
-            print("  Analyzing topics...")
-            self.top_topics[company] = self.extract_topics(texts)
-            
-            # Generate word cloud
-            text = " ".join(texts)
-            if text.strip():
-                print("  Generating word cloud...")
-                cleaned_text = self.clean_text_for_wordcloud(text, company)
-                if cleaned_text.strip():
-                    wordcloud = WordCloud(width=400, height=200,
-                                        background_color='white',
-                                        min_word_length=4,
-                                        collocations=False
-                                        ).generate(cleaned_text)
-                    
-                    img_buffer = io.BytesIO()
-                    plt.figure(figsize=(4, 2))
-                    plt.imshow(wordcloud, interpolation='bilinear')
-                    plt.axis('off')
-                    plt.tight_layout(pad=0)
-                    plt.savefig(img_buffer, format='png', bbox_inches='tight')
-                    plt.close()
-                    img_buffer.seek(0)
-                    self.word_clouds[company] = base64.b64encode(img_buffer.getvalue()).decode()
-                else:
-                    print("  No words remained for word cloud")
-                    self.word_clouds[company] = None
-            else:
-                print("  No text available for word cloud")
-                self.word_clouds[company] = None
-        else:
-            print("  No articles found for topic analysis and word cloud")
-            self.top_topics[company] = []
-            self.word_clouds[company] = None
+        # Optionally analyze full article bodies instead of snippets
+        if FULL_TEXT['enabled'] and verified_results:
+            print("  Fetching full article text...")
+            attach_full_text(verified_results, fetcher=self.fetcher)
         
         return verified_results
 
-    def search_combined_news(self, company1, company2):
-        """Search for news mentioning both companies using direct website scraping."""
-        print(f"\nSearching for articles mentioning both {company1} and {company2}...")
-        verified_results = []
-        seen_titles = set()
-        
-        # Get company variations
-        variations1 = self.company_variations.get(company1, [company1])
-        variations1.append(company1)
-        variations2 = self.company_variations.get(company2, [company2])
-        variations2.append(company2)
-        
-        # Check RSS feeds first
-        for source_name, source_info in self.news_sources.items():
-            if source_info.get('rss'):
-                print(f"  Checking {source_name} RSS feed...")
-                entries = self.fetch_rss_feed(source_info['rss'])
-                
-                for entry in entries:
-                    title = entry.get('title', '')
-                    link = entry.get('link', '')
-                    desc = entry.get('description', '')
-                    
-                    # Check if article mentions both companies
-                    text = f"{title} {desc}".lower()
-                    if (any(var.lower() in text for var in variations1) and 
-                        any(var.lower() in text for var in variations2)):
-                        if title and link and title not in seen_titles:
-                            if self.validate_link(link):
-                                verified_results.append({
-                                    'title': title,
-                                    'desc': desc,
-                                    'link': link,
-                                    'date': entry.get('published', '')
-                                })
-                                seen_titles.add(title)
-                                print(f"    ✓ Found article: {title[:50]}...")
-        
-            # Then try search pages
-            if source_info.get('search'):
-                print(f"  Searching {source_name} website...")
-                time.sleep(random.uniform(2, 4))  # Delay between searches
-                
-                # Try searching for each combination of variations
-                for var1 in variations1:
-                    for var2 in variations2:
-                        query = f"{var1} {var2}"
-                        results = self.scrape_search_page(source_info['search'], query)
-                        
-                        for result in results:
-                            title = result.get('title')
-                            link = result.get('link')
-                            desc = result.get('desc', '')
-                            
-                            # Verify both companies are mentioned
-                            text = f"{title} {desc}".lower()
-                            if (any(var.lower() in text for var in variations1) and 
-                                any(var.lower() in text for var in variations2)):
-                                if title and link and title not in seen_titles:
-                                    if self.validate_link(link):
-                                        verified_results.append({
-                                            'title': title,
-                                            'desc': desc,
-                                            'link': link,
-                                            'date': ''
-                                        })
-                                        seen_titles.add(title)
-                                        print(f"    ✓ Found article: {title[:50]}...")
-                        
-                        if len(verified_results) >= 5:
-                            break
-                    
-                    if len(verified_results) >= 5:
-                        break
-        
-        print(f"  Found {len(verified_results)} valid articles")
-        return verified_results
+    def tag_article(self, article, company):
+        """Store the article's company bitmask and keep the co-mention counts up to date."""
+        hits = self.matcher.match(f"{article.get('title', '')} {article.get('desc', '')}")
+        self.co_mentions.tag(article, hits.companies | {company}, url_hash(article['link']))
+
+    def is_syndicated_copy(self, stories, title, desc, link):
+        """True if a near-identical story was already kept; the copy is listed under it."""
+        article = {'title': title, 'desc': desc, 'link': link}
+        representative = stories.find(duplicate_text(article))
+        if representative is None:
+            return False
+        record_duplicate(representative, article)
+        return True
 
-    def clean_text_for_wordcloud(self, text, company):
-        # Simple tokenization using split
-        words = text.lower().split()
-        # Remove company name words, stop words, and short words
+    def word_cloud_frequencies(self, term_matrix, company):
+        """Top 20 words of a company (4+ letters, no company name words or stop words) with their counts"""
         company_words = set(company.lower().split())
         # For VitaNuova, also add individual parts
         if "vitanuova" in company.lower():
             company_words.update(["vita", "nuova"])
         
-        filtered_words = [
-            word.strip('.,!?()[]{}":;') for word in words 
-            if len(word) >= 4 and  # Only words with 4+ letters
-            word.strip('.,!?()[]{}":;').isalpha() and  # Only alphabetic words
-            word not in company_words and  # Remove company name words
-            word not in self.stop_words  # Remove stop words
-        ]
-        
-        # Count word frequencies and get top 20
-        word_freq = Counter(filtered_words)
-        top_words = [word for word, _ in word_freq.most_common(20)]
-        return " ".join(top_words)
+        return term_matrix.top_terms(company, n=20, min_length=4, stop_words=self.stop_words | company_words)
 
-    def extract_topics(self, texts):
-        """Extract main topics from a list of texts using semantic analysis"""
-        # Combine all texts
-        combined_text = " ".join(texts)
-        
-        # Define detailed topic categories with related terms
-        topic_categories = {
-            'Environmental': ['sostenibilità', 'ambiente', 'green', 'climate', 'energia', 'rinnovabile', 'emissioni', 'riciclo'],
-            'Digital Innovation': ['innovazione', 'digitale', 'tecnologia', 'digital', 'startup', 'intelligenza', 'app', 'online'],
-            'Investment': ['finanza', 'investimenti', 'risparmio', 'mercato', 'economia', 'finanziario', 'borsa', 'trading'],
-            'Health Services': ['salute', 'sanitario', 'benessere', 'prevenzione', 'medico', 'assistenza', 'clinica', 'terapia'],
-            'Community Support': ['sociale', 'comunità', 'welfare', 'solidarietà', 'inclusione', 'diversity', 'volontariato', 'donazioni'],
-            'Business Growth': ['business', 'strategia', 'partnership', 'crescita', 'sviluppo', 'mercato', 'espansione', 'acquisizione'],
-            'Customer Service': ['clienti', 'servizio', 'assistenza', 'supporto', 'soddisfazione', 'qualità', 'esperienza', 'consulenza'],
-            'Product Innovation': ['prodotti', 'soluzioni', 'novità', 'lancio', 'offerta', 'polizza', 'copertura', 'protezione'],
-            'Market Position': ['leadership', 'competitività', 'posizione', 'quota', 'presenza', 'network', 'distribuzione', 'canali'],
-            'Risk Management': ['rischio', 'sicurezza', 'protezione', 'gestione', 'controllo', 'compliance', 'normativa', 'regolamento']
-        }
-        
-        # Count occurrences of topic-related terms
-        topic_scores = Counter()
-        words = combined_text.lower().split()
+    def analyze_texts(self):
+        """Topics over the last 12 months of stored counts, and word clouds from one term matrix of this run's articles."""
+        since_timestamp = int((datetime.now() - timedelta(days=365)).timestamp())
+        topic_store = TopicStore()
+        term_counts = {}
+        for company in self.companies:
+            # Only articles never seen before are added to the daily counters
+            topic_store.ingest(company, self.articles.get(company, []))
+            term_counts[company] = topic_store.term_counts(company, since_timestamp)
+        topic_store.close()
+        # Every company's topics are scored in one call
+        self.top_topics = self.topic_index.top_topics_from_counts(term_counts, 3)
+        
+        # Keep every article searchable across runs
+        search_index = ArticleIndex()
+        for company in self.companies:
+            search_index.add(self.articles.get(company, []), company)
+        search_index.close()
         
-        for word in words:
-            for topic, terms in topic_categories.items():
-                if any(term in word for term in terms):
-                    topic_scores[topic] += 1
+        term_matrix = TermMatrix({company: self.articles.get(company, []) for company in self.companies},
+                                 tokenizer=article_tokens)
         
-        # Get top 3 topics with their scores
-        top_topics = topic_scores.most_common(3)
-        return [(topic, score) for topic, score in top_topics if score > 0]
+        for company in self.companies:
+            if not self.articles.get(company):
+                print(f"  {company}: no articles found for word cloud")
+                self.word_clouds[company] = None
+                continue
+            
+            frequencies = self.word_cloud_frequencies(term_matrix, company)
+            if not frequencies:
+                print(f"  {company}: no words remained for word cloud")
+                self.word_clouds[company] = None
+                continue
+            
+            print(f"  Generating word cloud for {company}...")
+            wordcloud = WordCloud(width=400, height=200,
+                                background_color='white',
+                                min_word_length=4,
+                                collocations=False
+                                ).generate_from_frequencies(frequencies)
+            
+            img_buffer = io.BytesIO()
+            plt.figure(figsize=(4, 2))
+            plt.imshow(wordcloud, interpolation='bilinear')
+            plt.axis('off')
+            plt.tight_layout(pad=0)
+            plt.savefig(img_buffer, format='png', bbox_inches='tight')
+            plt.close()
+            img_buffer.seek(0)
+            self.word_clouds[company] = base64.b64encode(img_buffer.getvalue()).decode()
 
     def generate_venn_diagram(self):
         """Generate a Venn diagram showing overlapping news coverage."""
         try:
-            # Get combined article counts
-            combined_12 = len(self.search_combined_news(self.companies[0], self.companies[1]))
-            combined_23 = len(self.search_combined_news(self.companies[1], self.companies[2]))
-            combined_13 = len(self.search_combined_news(self.companies[0], self.companies[2]))
+            # Group sizes straight from the article bitmask histogram (one pass over articles)
+            pair_counts = self.co_mentions.combination_counts(list(itertools.combinations(self.companies, 2)))
             
-            # Create sets for Venn diagram
-            # Note: We're using approximate set sizes since we can't determine exact overlaps
-            sets = (
-                self.article_counts[self.companies[0]],  # A
-                self.article_counts[self.companies[1]],  # B
-                self.article_counts[self.companies[2]],  # C
-                combined_12,  # A&B
-                combined_23,  # B&C
-                combined_13,  # A&C
-                min(combined_12, combined_23, combined_13)  # A&B&C (approximated)
-            )
-            
-            # Create Venn diagram
-            plt.figure(figsize=(6, 4))
-            venn3(subsets=sets, set_labels=self.companies)
-            plt.title('News Coverage Overlap')
+            if len(self.companies) == 3:
+                plt.figure(figsize=(6, 4))
+                venn3(subsets=venn3_subsets(self.co_mentions.mask_counts), set_labels=self.companies)
+                plt.title('News Coverage Overlap')
+            else:
+                # More (or fewer) companies than a Venn diagram can show: UpSet-style plot
+                plot_upset(self.companies, self.co_mentions.mask_counts, title='News Coverage Overlap')
             
             # Convert to base64 image
             img_buffer = io.BytesIO()
             plt.savefig(img_buffer, format='png', bbox_inches='tight')
-            plt.close()
+            plt.close('all')
             img_buffer.seek(0)
             venn_image = base64.b64encode(img_buffer.getvalue()).decode()
             
@@ -523,12 +476,7 @@ class NewsScanner:
             html += f'<img src="data:image/png;base64,{venn_image}" alt="Venn diagram of news coverage overlap">'
             
             # Add cross-reference links for each pair
-            for i, (company1, company2) in enumerate([
-                (self.companies[0], self.companies[1]),
-                (self.companies[1], self.companies[2]),
-                (self.companies[0], self.companies[2])
-            ]):
-                combined_count = [combined_12, combined_23, combined_13][i]
+            for (company1, company2), combined_count in pair_counts.items():
                 html += f"""
                     <div class="stats">
                         Articles mentioning both {company1} and {company2}: {combined_count}
@@ -894,8 +842,23 @@ class NewsScanner:
         print("Period: Last 12 months")
         print("Companies:", ", ".join(self.companies))
         
-        for company in self.companies:
-            self.search_company_news(company)
+        try:
+            for company in self.companies:
+                self.search_company_news(company)
+        finally:
+            self.fetcher.close()
+        
+        self.validated_urls.save()
+        
+        if self.other_language_count:
+            print(f"\nSkipped {self.other_language_count} items in other languages")
+        
+        print("\nAnalyzing topics and word clouds...")
+        self.analyze_texts()
+        
+        if self.page_encodings:
+            paths = Counter(self.page_encodings.values())
+            print("\nPage charset detection:", ", ".join(f"{path}: {count}" for path, count in paths.most_common()))
         
         print("\nGenerating HTML report...")
         self.generate_html()
@@ -903,6 +866,9 @@ class NewsScanner:
 
     def validate_link(self, url):
         """Validate if a link is accessible with retry logic."""
+        if url in self.validated_urls:
+            return True
+        
         max_retries = 2
         base_delay = 3
         
@@ -922,6 +888,7 @@ class NewsScanner:
                 response = requests.head(url, headers=headers, timeout=10, allow_redirects=True)
                 
                 if response.status_code == 200:
+                    self.validated_urls.add(url)
                     return True
                 elif response.status_code in [429, 503, 520]:  # Rate limit or service unavailable
                     if attempt < max_retries - 1:
@@ -0,0 +1,87 @@
+# Containers that wrap one article teaser on most Italian news portals
+DEFAULT_CONTAINER_SELECTOR = 'article, li.post, div.post, div.item, div.news-item'
+
+# Generic selectors tried inside a container when the site-specific ones miss
+FALLBACK_SELECTORS = {
+    'title_selector': 'h2 a, h3 a, .article-title a, .title a, h2, h3',
+    'content_selector': '.article-content, .content, .article-body, .body, .excerpt, p',
+    'date_selector': 'time, .date, .time, .published, .article-date',
+    'link_selector': 'h2 a, h3 a, .title a, a[href]'
+}
+
+# How far to climb from a title element when looking for its container
+MAX_CONTAINER_DEPTH = 4
+
+def _element_text(elem):
+    return ' '.join(elem.get_text(' ').split()) if elem else ''
+
+def _select_field(container, source, field):
+    elem = container.select_one(source[field]) if source.get(field) else None
+    if elem is None:
+        elem = container.select_one(FALLBACK_SELECTORS[field])
+    return elem
+
+def _enclosing_container(title_elem, source):
+    """Climb from a title to the smallest ancestor that also holds the article's content."""
+    container = title_elem
+    for _ in range(MAX_CONTAINER_DEPTH):
+        if container.parent is None:
+            break
+        container = container.parent
+        if container.select_one(source['content_selector']):
+            return container
+    return title_elem.parent or title_elem
+
+def find_article_containers(soup, source, limit=20):
+    """Locate the first limit article containers once each, in document order.
+
+    The limit applies to the containers kept, not to the raw selector matches,
+    which include nested and title-less elements.
+    """
+    selector = source.get('container_selector', DEFAULT_CONTAINER_SELECTOR)
+    containers = soup.select(selector) if selector else []
+    # Keep only outermost containers that actually hold a title
+    kept = []
+    for container in containers:
+        if len(kept) >= limit:
+            break
+        if any(parent is k for parent in container.parents for k in kept):
+            continue
+        if _select_field(container, source, 'title_selector'):
+            kept.append(container)
+    if kept:
+        return kept
+
+    # No container markup: derive one from each title
+    titles = soup.select(source['title_selector']) or soup.select(FALLBACK_SELECTORS['title_selector'])
+    containers = []
+    for title_elem in titles:
+        if len(containers) >= limit:
+            break
+        container = _enclosing_container(title_elem, source)
+        if not any(container is c for c in containers):
+            containers.append(container)
+    return containers
+
+def extract_site_articles(soup, source, limit=20):
+    """Extract title, content, date and link for each article from its own container.
+
+    Every field comes from the same subtree, so a missing date or excerpt on one
+    article can never shift the fields of the articles that follow it.
+    """
+    articles = []
+    for container in find_article_containers(soup, source, limit):
+        title_elem = _select_field(container, source, 'title_selector')
+        content_elem = _select_field(container, source, 'content_selector')
+        date_elem = _select_field(container, source, 'date_selector')
+        link_elem = _select_field(container, source, 'link_selector')
+        if link_elem is not None and link_elem.name != 'a':
+            link_elem = link_elem.find('a')
+
+        articles.append({
+            'title': _element_text(title_elem),
+            'content': _element_text(content_elem),
+            'date': (date_elem.get('datetime') or _element_text(date_elem)) if date_elem else '',
+            'link': link_elem.get('href', '') if link_elem is not None else ''
+        })
+    return articles
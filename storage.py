@@ -0,0 +1,34 @@
+import csv
+import glob
+
+# Past CSV exports read by the sentiment cache, the search index and the relevance labels
+HISTORY_FILES = ['master_results.csv', 'news_analysis_*.csv']
+
+# Keys bound per query, to stay under SQLite's bound-parameter limit
+MAX_QUERY_KEYS = 500
+
+def read_history(patterns=HISTORY_FILES):
+    """Yield the rows of each CSV file matching patterns, one list per file.
+
+    Files that cannot be read are reported and skipped.
+    """
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                with open(path, encoding='utf-8-sig', newline='') as f:
+                    rows = list(csv.DictReader(f))
+            except (OSError, csv.Error) as e:
+                print(f"Error reading {path}: {str(e)}")
+                continue
+            yield rows
+
+def select_in(connection, query, keys, params=()):
+    """Yield the rows of query for keys, run once per MAX_QUERY_KEYS keys.
+
+    query has a {placeholders} field for the IN list, which must come after
+    the placeholders of params.
+    """
+    keys = list(keys)
+    for start in range(0, len(keys), MAX_QUERY_KEYS):
+        chunk = keys[start:start + MAX_QUERY_KEYS]
+        yield from connection.execute(query.format(placeholders=','.join('?' * len(chunk))), [*params, *chunk])
@@ -0,0 +1,149 @@
+import numpy as np
+from scipy import sparse
+from text_processing import tokenize
+
+class TermMatrix:
+    """Sparse article-by-term and company-by-term counts, built once per run.
+
+    Word clouds and distinctive topics are read from these
+    matrices instead of re-tokenizing and re-counting each company's text.
+    """
+
+    def __init__(self, texts_by_company, tokenizer=tokenize):
+        self.companies = list(texts_by_company)
+        self.vocabulary = {}
+        rows, columns, article_companies = [], [], []
+        for company_id, texts in enumerate(texts_by_company.values()):
+            for text in texts:
+                row = len(article_companies)
+                article_companies.append(company_id)
+                for token in tokenizer(text):
+                    columns.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                    rows.append(row)
+
+        self.terms = list(self.vocabulary)
+        article_count = len(article_companies)
+        # Repeated (article, term) pairs are summed into counts
+        self.article_terms = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int64), (rows, columns)),
+            shape=(article_count, len(self.terms))
+        )
+        self.article_companies = np.array(article_companies, dtype=np.int64)
+        membership = sparse.csr_matrix(
+            (np.ones(article_count, dtype=np.int64), (self.article_companies, np.arange(article_count))),
+            shape=(len(self.companies), article_count)
+        )
+        self.company_terms = (membership @ self.article_terms).tocsr()
+        self.term_lengths = np.fromiter(map(len, self.terms), dtype=np.int64, count=len(self.terms))
+        self.stop_masks = {}
+
+    @classmethod
+    def from_counts(cls, counts_by_company):
+        """Company-by-term matrix from precomputed {company: {term: count}} (no article rows)."""
+        matrix = cls.__new__(cls)
+        matrix.companies = list(counts_by_company)
+        matrix.vocabulary = {}
+        rows, columns, values = [], [], []
+        for company_id, counts in enumerate(counts_by_company.values()):
+            for term, count in counts.items():
+                rows.append(company_id)
+                columns.append(matrix.vocabulary.setdefault(term, len(matrix.vocabulary)))
+                values.append(count)
+        matrix.terms = list(matrix.vocabulary)
+        matrix.term_lengths = np.fromiter(map(len, matrix.terms), dtype=np.int64, count=len(matrix.terms))
+        matrix.article_terms = None
+        matrix.article_companies = None
+        matrix.company_terms = sparse.csr_matrix(
+            (np.array(values, dtype=np.int64), (rows, columns)),
+            shape=(len(matrix.companies), len(matrix.terms))
+        )
+        matrix.stop_masks = {}
+        return matrix
+
+    def _stop_mask(self, is_stop_word):
+        # One pass over the vocabulary per stop-word test, so pass a long-lived
+        # callable (e.g. STOP_WORD_FILTER.is_stop_word) rather than a new closure
+        mask = self.stop_masks.get(is_stop_word)
+        if mask is None:
+            mask = np.fromiter(map(is_stop_word, self.terms), dtype=bool, count=len(self.terms))
+            self.stop_masks[is_stop_word] = mask
+        return mask
+
+    def _term_mask(self, min_length=1, is_stop_word=None, stop_words=None):
+        keep = self.term_lengths >= min_length
+        if is_stop_word is not None:
+            keep &= ~self._stop_mask(is_stop_word)
+        if stop_words:
+            # A word set costs one vocabulary lookup per word, no pass over the vocabulary
+            columns = [self.vocabulary[word] for word in stop_words if word in self.vocabulary]
+            keep[columns] = False
+        return keep
+
+    def counts(self, company, min_length=1, is_stop_word=None, stop_words=None):
+        """Dense term counts for company, zeroed for short terms and stop words.
+
+        Stop words are given as a test (is_stop_word) or as a set of words (stop_words).
+        """
+        counts = self.company_terms[self.companies.index(company)].toarray().ravel()
+        return np.where(self._term_mask(min_length, is_stop_word, stop_words), counts, 0)
+
+    def top_terms(self, company, n=None, min_length=1, min_count=1, is_stop_word=None, stop_words=None):
+        """{term: count} for the most frequent terms of company, highest first."""
+        counts = self.counts(company, min_length, is_stop_word, stop_words)
+        candidates = np.flatnonzero(counts >= max(min_count, 1))
+        order = candidates[np.argsort(-counts[candidates], kind='stable')]
+        if n is not None:
+            order = order[:n]
+        return {self.terms[i]: int(counts[i]) for i in order}
+
+    def distinctive_topics(self, n=10, min_length=1, min_count=1, is_stop_word=None,
+                           prior=100.0, z_threshold=1.96, n_shared=10):
+        """Distinctive and shared topics for every company, from one pass over the matrix.
+
+        Each (company, term) count is scored with the log-odds ratio against all
+        other companies under an informative Dirichlet prior, z-scored by its
+        variance. Terms with z above z_threshold are distinctive for the company;
+        terms used at least min_count times by two or more companies without being
+        distinctive for any of them are shared. Returns
+        {company: {'distinctive': {term: z}, 'shared': {term: count}}}.
+        """
+        results = {company: {'distinctive': {}, 'shared': {}} for company in self.companies}
+        counts = self.company_terms.tocoo()
+        keep = self._term_mask(min_length, is_stop_word)[counts.col] & (counts.data >= min_count)
+        rows, columns, y = counts.row[keep], counts.col[keep], counts.data[keep].astype(float)
+        if not len(y):
+            return results
+
+        term_totals = np.asarray(self.company_terms.sum(axis=0)).ravel().astype(float)
+        company_totals = np.asarray(self.company_terms.sum(axis=1)).ravel().astype(float)
+        total = term_totals.sum()
+        alpha = prior * term_totals[columns] / total
+        y_rest = term_totals[columns] - y
+        n_company = company_totals[rows]
+        n_rest = total - n_company
+        delta = (np.log((y + alpha) / (n_company + prior - y - alpha))
+                 - np.log((y_rest + alpha) / (n_rest + prior - y_rest - alpha)))
+        z = delta / np.sqrt(1.0 / (y + alpha) + 1.0 / (y_rest + alpha))
+
+        # Top n distinctive terms per company: sort by (company, -z) once, keep the first n of each run
+        distinctive = z > z_threshold
+        picked = np.flatnonzero(distinctive)
+        picked = picked[np.lexsort((-z[picked], rows[picked]))]
+        if len(picked):
+            group_rows = rows[picked]
+            starts = np.flatnonzero(np.r_[True, group_rows[1:] != group_rows[:-1]])
+            ranks = np.arange(len(picked)) - np.repeat(starts, np.diff(np.r_[starts, len(picked)]))
+            for i in picked[ranks < n]:
+                results[self.companies[rows[i]]]['distinctive'][self.terms[columns[i]]] = float(z[i])
+
+        # Shared: used by 2+ companies, distinctive for none
+        users = np.bincount(columns, minlength=len(self.terms))
+        distinctive_terms = np.zeros(len(self.terms), dtype=bool)
+        distinctive_terms[columns[distinctive]] = True
+        candidates = np.flatnonzero((users >= 2) & ~distinctive_terms)
+        shared = candidates[np.argsort(-term_totals[candidates], kind='stable')[:n_shared]]
+        shared_mask = np.zeros(len(self.terms), dtype=bool)
+        shared_mask[shared] = True
+        for i in np.flatnonzero(shared_mask[columns]):
+            results[self.companies[rows[i]]]['shared'][self.terms[columns[i]]] = int(y[i])
+        return results
@@ -0,0 +1,30 @@
+import unittest
+from unused.simple_news_scraper import choose_parser
+
+class ChooseParserTest(unittest.TestCase):
+    def test_body_decides_first(self):
+        cases = [
+            ('text/html', b'<?xml version="1.0"?><rss version="2.0">', 'xml'),
+            ('text/html; charset=utf-8', b'\xef\xbb\xbf\n  <rss version="2.0">', 'xml'),
+            ('text/plain', b'<feed xmlns="http://www.w3.org/2005/Atom">', 'xml'),
+            ('text/html', b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">', 'xml'),
+            # An HTML page wins over a feed Content-Type and over its own XML prolog
+            ('application/rss+xml', b'<!DOCTYPE html><html lang="it">', 'lxml'),
+            ('application/xhtml+xml', b'<?xml version="1.0"?><html xmlns="http://www.w3.org/1999/xhtml">', 'lxml')
+        ]
+        for content_type, content, parser in cases:
+            with self.subTest(content_type=content_type, content=content):
+                self.assertEqual(choose_parser(content_type, content), parser)
+
+    def test_header_when_body_is_unclear(self):
+        self.assertEqual(choose_parser('application/atom+xml', b'  '), 'xml')
+        self.assertEqual(choose_parser('TEXT/XML', b'<channel>'), 'xml')
+        self.assertEqual(choose_parser('text/html', b'<div>'), 'lxml')
+        self.assertEqual(choose_parser(None, b''), 'lxml')
+
+    def test_only_the_start_is_inspected(self):
+        content = b'<div>' + b' ' * 1000 + b'<rss>'
+        self.assertEqual(choose_parser('text/html', content), 'lxml')
+
+if __name__ == '__main__':
+    unittest.main()
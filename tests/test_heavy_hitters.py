@@ -0,0 +1,56 @@
+import random
+import unittest
+from collections import Counter
+from heavy_hitters import SpaceSaving
+
+def zipf_stream(rng, terms, length):
+    weights = [1 / rank for rank in range(1, terms + 1)]
+    return rng.choices([f'term{i}' for i in range(terms)], weights, k=length)
+
+class SpaceSavingTest(unittest.TestCase):
+    def test_exact_below_capacity(self):
+        summary = SpaceSaving(10)
+        summary.update_counts([('polizza', 3), ('broker', 5), ('polizza', 4)])
+        summary.update('agenti')
+        self.assertEqual(summary.top(), [('polizza', 7, 0), ('broker', 5, 0), ('agenti', 1, 0)])
+        self.assertEqual(summary.most_common(1), [('polizza', 7)])
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(summary.total, 13)
+
+    def test_error_bound(self):
+        rng = random.Random(0)
+        for capacity in (5, 20, 100):
+            stream = zipf_stream(rng, 500, 5000)
+            exact = Counter(stream)
+            summary = SpaceSaving(capacity)
+            for term in stream:
+                summary.update(term)
+            with self.subTest(capacity=capacity):
+                self.assertEqual(len(summary), capacity)
+                self.assertEqual(summary.max_error, len(stream) / capacity)
+                for term, estimate, error in summary.top():
+                    # Never an undercount, and the overcount is within the reported error
+                    self.assertGreaterEqual(estimate, exact[term])
+                    self.assertLessEqual(estimate - exact[term], error)
+                    self.assertLessEqual(error, summary.max_error)
+                # Every term heavier than total / capacity is kept
+                tracked = set(summary.counts)
+                for term, count in exact.items():
+                    if count > summary.max_error:
+                        self.assertIn(term, tracked)
+
+    def test_weighted_updates(self):
+        rng = random.Random(1)
+        pairs = [(term, rng.randint(1, 5)) for term in zipf_stream(rng, 200, 2000)]
+        exact = Counter()
+        for term, weight in pairs:
+            exact[term] += weight
+        summary = SpaceSaving(30)
+        summary.update_counts(pairs)
+        self.assertEqual(summary.total, sum(exact.values()))
+        for term, estimate, error in summary.top():
+            self.assertLessEqual(exact[term], estimate)
+            self.assertLessEqual(estimate - error, exact[term])
+
+if __name__ == '__main__':
+    unittest.main()
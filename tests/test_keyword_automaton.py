@@ -0,0 +1,45 @@
+import random
+import unittest
+from company_matcher import CompanyMatcher, KeywordAutomaton
+
+def brute_force(patterns, text):
+    """Every (end index, pattern, value) found by testing each pattern at each offset."""
+    found = []
+    for pattern, value in patterns:
+        start = text.find(pattern)
+        while start != -1:
+            found.append((start + len(pattern) - 1, pattern, value))
+            start = text.find(pattern, start + 1)
+    return sorted(found)
+
+class KeywordAutomatonTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        for trial in range(200):
+            # A tiny alphabet makes overlapping and nested patterns common
+            patterns = [(''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))), i) for i in range(rng.randint(1, 8))]
+            text = ''.join(rng.choice('abc ') for _ in range(rng.randint(0, 40)))
+            automaton = KeywordAutomaton()
+            for pattern, value in patterns:
+                automaton.add(pattern, value)
+            with self.subTest(trial=trial, patterns=patterns, text=text):
+                self.assertEqual(sorted(automaton.iter_matches(text)), brute_force(patterns, text))
+
+    def test_add_after_build(self):
+        automaton = KeywordAutomaton()
+        automaton.add('vita', 1)
+        self.assertEqual(list(automaton.iter_matches('la vita nuova')), [(6, 'vita', 1)])
+        automaton.add('nuova', 2)
+        self.assertEqual(list(automaton.iter_matches('la vita nuova')), [(6, 'vita', 1), (12, 'nuova', 2)])
+
+class CompanyMatcherTest(unittest.TestCase):
+    def test_match_and_mentions(self):
+        matcher = CompanyMatcher({'Unidea': ['Unidea', 'Unidea Ass.'], 'Generali': ['Generali']}, ['polizza'])
+        matches = matcher.match('UNIDEA Ass. e Generali: nuova Polizza')
+        self.assertEqual(matches.companies, {'Unidea', 'Generali'})
+        self.assertEqual(matches.keywords, {'polizza'})
+        self.assertEqual(matcher.mentions('Generali e Unidea'), ['Unidea', 'Generali'])
+        self.assertEqual(matcher.match(None), (set(), set()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from memo import BoundedMemo
+
+class BoundedMemoTest(unittest.TestCase):
+    def test_computes_once_and_empties_when_full(self):
+        calls = []
+        memo = BoundedMemo(3, lambda key: calls.append(key) or key.upper())
+        self.assertEqual([memo[key] for key in 'abab'], ['A', 'B', 'A', 'B'])
+        self.assertEqual(calls, ['a', 'b'])
+        memo['c']
+        memo['d']
+        self.assertEqual(sorted(memo), ['d'])
+        self.assertEqual(memo.get('e'), None)
+
+    def test_missing(self):
+        memo = BoundedMemo(4)
+        memo.update(a=0, b=1)
+        self.assertEqual(memo.missing(['a', 'c', 'c']), {'c'})
+        # Three new keys do not fit next to two stored ones: the batch starts from empty
+        self.assertEqual(memo.missing(['a', 'd', 'e', 'f']), {'a', 'd', 'e', 'f'})
+        self.assertEqual(memo, {})
+        with self.assertRaises(KeyError):
+            memo['a']
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import numpy as np
+from near_duplicates import NearDuplicateIndex, collapse_near_duplicates, shingles
+
+STORY = ("Alleanza Assicurazioni chiude il primo semestre con premi in crescita del dodici per cento "
+         "e rafforza la rete di agenti in tutta Italia")
+COPY = STORY + " secondo una nota della compagnia"
+OTHER = ("Unidea Assicurazioni lancia una nuova polizza per la casa dedicata alle famiglie "
+         "con figli piccoli e animali domestici")
+
+class ShinglesTest(unittest.TestCase):
+    def test_shingles(self):
+        self.assertEqual(len(shingles('uno due tre quattro', 3)), 2)
+        # Texts no longer than the shingle size become one shingle; empty texts none
+        self.assertEqual(len(shingles('uno due', 3)), 1)
+        self.assertEqual(len(shingles('', 3)), 0)
+        # Word n-grams are case- and punctuation-insensitive
+        np.testing.assert_array_equal(shingles('Uno, due tre!', 2), shingles('uno due tre', 2))
+
+class MinHashTest(unittest.TestCase):
+    def test_signature_is_deterministic(self):
+        first, second = NearDuplicateIndex(), NearDuplicateIndex()
+        np.testing.assert_array_equal(first.signature(STORY), second.signature(STORY))
+        self.assertEqual(len(first.signature(STORY)), first.num_perm)
+        self.assertIsNone(first.signature(''))
+
+    def test_signature_agreement_estimates_jaccard(self):
+        index = NearDuplicateIndex(num_perm=256, bands=32)
+        a, b = set(shingles(STORY, 3)), set(shingles(COPY, 3))
+        jaccard = len(a & b) / len(a | b)
+        agreement = np.mean(index.signature(STORY) == index.signature(COPY))
+        self.assertAlmostEqual(agreement, jaccard, delta=0.1)
+        self.assertLess(np.mean(index.signature(STORY) == index.signature(OTHER)), 0.1)
+
+    def test_find_and_add(self):
+        index = NearDuplicateIndex()
+        self.assertIsNone(index.find(STORY))
+        self.assertEqual(index.add('story', STORY), 'story')
+        self.assertEqual(index.find(COPY), 'story')
+        self.assertIsNone(index.find(OTHER))
+        self.assertEqual(index.add('copy', COPY), 'story')
+        self.assertEqual(index.add('other', OTHER), 'other')
+        # Texts without words are never matched, each is its own story
+        self.assertEqual(index.add('empty', ''), 'empty')
+        self.assertEqual(index.add('empty again', ''), 'empty again')
+        self.assertEqual(index.clusters, [['story', 'copy'], ['other'], ['empty'], ['empty again']])
+
+    def test_collapse_near_duplicates(self):
+        articles = [{'title': STORY, 'link': 'https://a.it/1', 'source': 'A'},
+                    {'title': OTHER, 'link': 'https://b.it/1', 'source': 'B'},
+                    {'title': COPY, 'link': 'https://c.it/1', 'source': 'C'}]
+        kept = collapse_near_duplicates(articles)
+        self.assertEqual([article['link'] for article in kept], ['https://a.it/1', 'https://b.it/1'])
+        self.assertEqual(kept[0]['duplicates'], [{'title': COPY, 'link': 'https://c.it/1', 'source': 'C'}])
+        self.assertNotIn('duplicates', kept[1])
+
+if __name__ == '__main__':
+    unittest.main()
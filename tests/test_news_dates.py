@@ -0,0 +1,38 @@
+import math
+import unittest
+from datetime import datetime, timedelta, timezone
+from news_dates import parse_date
+
+# 2024-02-20 00:00:00 UTC
+FEB_20 = 1708387200
+
+class ParseDateTest(unittest.TestCase):
+    def test_parsed_dates(self):
+        cases = [
+            ('2024-02-20', FEB_20),
+            ('2024-02-20T10:30:00Z', FEB_20 + 37800),
+            ('2024-02-20T10:30:00.123+01:00', FEB_20 + 34200),
+            ('2024-02-20 10:30:00', FEB_20 + 37800),
+            ('Tue, 20 Feb 2024 10:30:00 +0100', FEB_20 + 34200),
+            ('Tue, 20 Feb 2024 10:30:00 GMT', FEB_20 + 37800),
+            ('20 febbraio 2024', FEB_20),
+            ('Pubblicato il 20 Feb. 2024', FEB_20),
+            ('20/02/2024', FEB_20),
+            ('20.02.2024', FEB_20),
+            (datetime(2024, 2, 20), FEB_20),
+            (datetime(2024, 2, 20, 1, tzinfo=timezone(timedelta(hours=1))), FEB_20),
+            (FEB_20, FEB_20),
+            (float(FEB_20), FEB_20),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(parse_date(value), expected)
+
+    def test_missing_or_invalid_dates(self):
+        for value in [None, '', '  ', 'nan', 'NaT', 'None', 'No date', math.nan, '31/02/2024',
+                      '30 febbraio 2024', 'ieri', '3 ore fa']:
+            with self.subTest(value=value):
+                self.assertIsNone(parse_date(value))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+import numpy as np
+from overlap import CoMentionCounter, group_by_mask, mask_words, region_mask, venn3_subsets
+
+COMPANIES = ['Vita Nuova', 'Unidea', 'Alleanza']
+
+class MaskHelpersTest(unittest.TestCase):
+    def test_region_mask_and_venn3_subsets(self):
+        self.assertEqual(region_mask('101'), 0b101)
+        self.assertEqual(venn3_subsets({0b001: 4, 0b011: 2, 0b111: 1}), (4, 0, 2, 0, 0, 0, 1))
+
+    def test_group_by_mask(self):
+        groups = group_by_mask([{'a', 'b'}, {'b', 'c'}])
+        self.assertEqual({mask: sorted(items) for mask, items in groups.items()}, {0b01: ['a'], 0b11: ['b'], 0b10: ['c']})
+
+    def test_mask_words(self):
+        words = mask_words([1, 1 << 64 | 3], 70)
+        np.testing.assert_array_equal(words, np.array([[1, 0], [3, 1]], dtype=np.uint64))
+        self.assertEqual(mask_words([], 3).shape, (0, 1))
+
+class CoMentionCounterTest(unittest.TestCase):
+    def test_tag_counts_each_article_once(self):
+        counter = CoMentionCounter(COMPANIES)
+        article = {}
+        self.assertEqual(counter.tag(article, ['Vita Nuova', 'Generali'], 'a'), 0b001)
+        # Found again by another company's search: counted once, with both companies
+        self.assertEqual(counter.tag({}, ['Unidea'], 'a'), 0b011)
+        counter.tag({}, ['Unidea', 'Alleanza'], 'b')
+        counter.tag({}, [], 'c')
+        self.assertEqual(article['company_mask'], 0b001)
+        self.assertEqual(counter.mask_counts, {0b011: 1, 0b110: 1})
+
+    def test_combination_counts_match_brute_force(self):
+        rng = random.Random(0)
+        companies = [f'company{i}' for i in range(70)]
+        counter = CoMentionCounter(companies)
+        mentions = [rng.sample(companies, rng.randint(1, 4)) for _ in range(300)]
+        for key, mentioned in enumerate(mentions):
+            counter.tag({}, mentioned, key)
+        combinations = [tuple(rng.sample(companies, 2)) for _ in range(50)] + [('company0', 'company69')]
+        expected = {c: sum(set(c) <= set(m) for m in mentions) for c in combinations}
+        self.assertEqual(counter.combination_counts(combinations), expected)
+        self.assertEqual(counter.combination_counts([]), {})
+
+    def test_meets_requirements(self):
+        counter = CoMentionCounter(COMPANIES)
+        pairs = [('Vita Nuova', 'Alleanza')]
+        self.assertTrue(counter.meets_requirements(0b101, pairs, min_companies=2))
+        self.assertFalse(counter.meets_requirements(0b011, pairs, min_companies=2))
+        self.assertFalse(counter.meets_requirements(0b001, [], min_companies=2))
+        # Without required combinations any mask with enough companies passes
+        self.assertTrue(counter.meets_requirements(0b110, [], min_companies=2))
+
+if __name__ == '__main__':
+    unittest.main()
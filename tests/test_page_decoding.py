@@ -0,0 +1,54 @@
+import codecs
+import unittest
+from unittest import mock
+import page_decoding
+from page_decoding import decode_content
+
+TEXT = 'Più polizze per l’età della pensione'
+
+class DecodeContentTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(decode_content(b''), ('', 'empty'))
+        self.assertEqual(decode_content(None, 'text/html'), ('', 'empty'))
+
+    def test_bom(self):
+        for bom, encoding in [(codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                              (codecs.BOM_UTF16_BE, 'utf-16-be'), (codecs.BOM_UTF32_LE, 'utf-32-le')]:
+            with self.subTest(encoding=encoding):
+                # The BOM beats a wrong header
+                self.assertEqual(decode_content(bom + TEXT.encode(encoding), 'text/html; charset=iso-8859-1'),
+                                 (TEXT, 'bom'))
+
+    def test_header(self):
+        body = TEXT.encode('cp1252')
+        self.assertEqual(decode_content(body, 'text/html; charset="windows-1252"'), (TEXT, 'header'))
+        # An unknown charset in the header is ignored
+        self.assertEqual(decode_content(TEXT.encode('utf-8'), 'text/html; charset=bogus'), (TEXT, 'utf-8'))
+
+    def test_meta(self):
+        body = b'<html><head><meta charset="windows-1252"></head><body>' + TEXT.encode('cp1252')
+        self.assertEqual(decode_content(body, 'text/html'),
+                         ('<html><head><meta charset="windows-1252"></head><body>' + TEXT, 'meta'))
+        http_equiv = b'<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-15">'
+        self.assertEqual(decode_content(http_equiv + 'città'.encode('iso-8859-15'))[1], 'meta')
+
+    def test_meta_only_in_the_first_bytes(self):
+        body = b' ' * page_decoding.META_SNIFF_BYTES + b'<meta charset="windows-1252">' + TEXT.encode('utf-8')
+        self.assertEqual(decode_content(body)[1], 'utf-8')
+
+    def test_undeclared(self):
+        self.assertEqual(decode_content(TEXT.encode('utf-8')), (TEXT, 'utf-8'))
+        body = TEXT.encode('cp1252')
+        with mock.patch.object(page_decoding, '_detect', return_value='cp1252'):
+            self.assertEqual(decode_content(body), (TEXT, 'detector'))
+        with mock.patch.object(page_decoding, '_detect', return_value=None):
+            self.assertEqual(decode_content(body), (TEXT, 'fallback'))
+
+    def test_detector_sees_a_bounded_sample(self):
+        body = b'\xe0' * (page_decoding.DETECT_BYTES * 2)
+        with mock.patch.object(page_decoding, '_detect', return_value=None) as detect:
+            decode_content(body)
+        self.assertEqual(len(detect.call_args[0][0]), page_decoding.DETECT_BYTES)
+
+if __name__ == '__main__':
+    unittest.main()
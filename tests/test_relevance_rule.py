@@ -0,0 +1,56 @@
+import unittest
+from company_matcher import RelevanceRule
+
+CONTEXT = ['assicurazioni', 'polizza', 'compagnia']
+
+def alleanza(**kwargs):
+    return RelevanceRule('Alleanza Assicurazioni', ['Alleanza', 'Alleanza Ass.'], ambiguous=['Alleanza'],
+                         exclusions=['alleanza atlantica'], context_terms=CONTEXT, **kwargs)
+
+class RelevanceRuleTest(unittest.TestCase):
+    def test_word_boundaries(self):
+        rule = alleanza()
+        self.assertTrue(rule.is_relevant('Alleanza Assicurazioni, utile in crescita', None))
+        self.assertTrue(rule.is_relevant('ALLEANZA   ASS. rinnova la rete', ''))
+        for title in ['Alleanzaassicurazioni in crescita', 'Nuova alleanzata per la polizza',
+                      'Superalleanza tra broker e compagnia']:
+            with self.subTest(title=title):
+                self.assertFalse(rule.is_relevant(title, ''))
+
+    def test_ambiguous_name_needs_context(self):
+        rule = alleanza()
+        self.assertFalse(rule.is_relevant('Alleanza tra comuni per i trasporti', ''))
+        self.assertTrue(rule.is_relevant('Alleanza tra comuni', 'Firmata con la compagnia'))
+        # The context term must be a whole word too
+        self.assertFalse(rule.is_relevant('Alleanza tra comuni', 'Le compagnie aeree'))
+
+    def test_context_window(self):
+        rule = alleanza(context_chars=30)
+        padding = ' parola' * 10
+        self.assertTrue(rule.is_relevant('Alleanza, nuova polizza', padding))
+        self.assertTrue(rule.is_relevant('Nuova polizza' + padding[:12], 'Alleanza'))
+        self.assertFalse(rule.is_relevant('Alleanza' + padding, 'nuova polizza'))
+        self.assertFalse(rule.is_relevant('Polizza' + padding, 'alleanza'))
+
+    def test_elision(self):
+        rule = alleanza()
+        self.assertFalse(rule.is_relevant("L'alleanza dei broker", 'Accordo con la compagnia'))
+        self.assertFalse(rule.is_relevant('Un’alleanza per la polizza auto', ''))
+        # A distinctive variation counts after an elided article as well
+        self.assertTrue(rule.is_relevant("L'Alleanza Assicurazioni di oggi", ''))
+
+    def test_exclusions_only_cover_their_mention(self):
+        rule = alleanza()
+        self.assertFalse(rule.is_relevant('Alleanza Atlantica, vertice della compagnia', ''))
+        self.assertTrue(rule.is_relevant('Alleanza Atlantica e Alleanza Assicurazioni', ''))
+        self.assertTrue(rule.is_relevant('Alleanza Atlantica, poi Alleanza', 'rinnova la polizza'))
+
+    def test_filter(self):
+        rule = alleanza()
+        articles = [{'title': 'Alleanza Assicurazioni', 'summary': ''},
+                    {'title': 'Alleanza Atlantica', 'summary': 'la compagnia'},
+                    {'title': None, 'summary': 'Alleanza, nuova polizza'}]
+        self.assertEqual(rule.filter(articles, description_key='summary'), [articles[0], articles[2]])
+
+if __name__ == '__main__':
+    unittest.main()
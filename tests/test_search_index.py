@@ -0,0 +1,75 @@
+import math
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from search_index import ArticleIndex
+from text_processing import tokenize
+
+WORDS = ['polizza', 'vita', 'broker', 'sinistro', 'premio', 'agenzia', 'rete', 'utile', 'bilancio', 'crescita']
+
+def bm25(titles, query, k1, b):
+    """Reference BM25 over title-only documents: {index: score} of every document matching query."""
+    counts = [Counter(tokenize(title)) for title in titles]
+    average = sum(sum(c.values()) for c in counts) / len(counts)
+    scores = {}
+    for term, query_count in Counter(tokenize(query)).items():
+        having = [i for i, c in enumerate(counts) if term in c]
+        idf = math.log(1 + (len(counts) - len(having) + 0.5) / (len(having) + 0.5))
+        for i in having:
+            tf = counts[i][term]
+            norm = k1 * (1 - b + b * sum(counts[i].values()) / average)
+            scores[i] = scores.get(i, 0) + query_count * idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+class ArticleIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def index(self, **kwargs):
+        index = ArticleIndex(os.path.join(self.directory, 'index.db'), field_weights={'title': 1.0}, **kwargs)
+        self.addCleanup(index.close)
+        return index
+
+    def test_ranking_matches_reference(self):
+        rng = random.Random(0)
+        titles = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))) + f' notizia{i}' for i in range(60)]
+        # Small batches and max_blocks exercise merged and unmerged postings alike
+        index = self.index(max_blocks=3)
+        for start in range(0, len(titles), 7):
+            index.add([{'title': title, 'link': f'https://example.com/{start + i}'}
+                       for i, title in enumerate(titles[start:start + 7])])
+        self.assertEqual(len(index), len(titles))
+        for query in ['polizza', 'vita polizza', 'broker broker utile', 'bilancio crescita rete', 'assente']:
+            expected = bm25(titles, query, index.k1, index.b)
+            results = index.search(query, n=10)
+            with self.subTest(query=query):
+                self.assertEqual(len(results), min(10, len(expected)))
+                best = sorted(expected.values(), reverse=True)[:10]
+                for result, score in zip(results, best):
+                    self.assertAlmostEqual(result['score'], score, places=4)
+                    self.assertAlmostEqual(expected[result['doc_id'] - 1], result['score'], places=4)
+
+    def test_company_filter(self):
+        index = self.index()
+        shared = {'title': 'Polizza vita per Unidea e Alleanza', 'link': 'https://example.com/shared'}
+        self.assertEqual(index.add([shared, {'title': 'Unidea, nuova polizza', 'link': 'a'}], company='Unidea'), 2)
+        # The same article found for another company is not indexed twice
+        self.assertEqual(index.add([shared, {'title': 'Alleanza polizza auto', 'link': 'b'}], company='Alleanza'), 1)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(len(index.search('polizza')), 3)
+        unidea = index.search('polizza', company='Unidea')
+        self.assertEqual(sorted(result['link'] for result in unidea), ['a', 'https://example.com/shared'])
+        shared_result = next(result for result in unidea if result['link'] == shared['link'])
+        self.assertEqual(sorted(shared_result['companies']), ['Alleanza', 'Unidea'])
+        alleanza = index.search('polizza', company='Alleanza')
+        self.assertEqual(sorted(result['link'] for result in alleanza), ['b', 'https://example.com/shared'])
+        self.assertEqual(index.search('polizza', company='Generali'), [])
+
+if __name__ == '__main__':
+    unittest.main()
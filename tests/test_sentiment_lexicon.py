@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from sentiment_lexicon import LexiconScorer, load_lexicon
+
+LEXICON = """# term<TAB>score
+ottimo\t1.0
+pessimo\t-1.0
+crescit*\t0.5
+cresc*\t0.2
+perdit*\t-0.5
+"""
+
+class LexiconScorerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handle, cls.path = tempfile.mkstemp(suffix='.tsv')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            f.write(LEXICON)
+        cls.scorer = LexiconScorer(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def test_load_lexicon(self):
+        entries = load_lexicon(self.path)
+        self.assertEqual(entries['ottimo'], (1.0, False))
+        self.assertEqual(entries['crescit'], (0.5, True))
+        self.assertEqual(len(entries), 5)
+
+    def test_exact_terms_and_mean(self):
+        self.assertEqual(self.scorer.score('Un risultato ottimo!'), 1.0)
+        self.assertEqual(self.scorer.score('Ottimo inizio, pessimo finale'), 0.0)
+        self.assertEqual(self.scorer.score('Nessun termine noto'), 0.0)
+        self.assertEqual(self.scorer.score(None), 0.0)
+
+    def test_stems(self):
+        # The longest matching stem wins
+        self.assertEqual(self.scorer.score('crescita dei premi'), 0.5)
+        self.assertEqual(self.scorer.score('crescono i premi'), 0.2)
+        self.assertEqual(self.scorer.score('perdite in calo'), -0.5)
+        # A stem needs the whole prefix, exact terms the whole word
+        self.assertEqual(self.scorer.score('cre ottimi'), 0.0)
+
+    def test_negation(self):
+        self.assertEqual(self.scorer.score('un risultato non ottimo'), -1.0)
+        # Only the word right after "non" is flipped
+        self.assertEqual(self.scorer.score('non è pessimo'), -1.0)
+        self.assertEqual(self.scorer.score('Non pessimo, ottimo'), 1.0)
+        # Elided articles are dropped before lookup
+        self.assertEqual(self.scorer.score("dell'ottimo lavoro"), 1.0)
+
+    def test_batch_keeps_documents_apart(self):
+        texts = ['ottimo', 'non', 'pessimo', '', 'crescita \x00 pessimo']
+        np.testing.assert_array_equal(self.scorer.score_batch(texts), [1.0, 0.0, -1.0, 0.0, -0.25])
+        self.assertEqual(len(self.scorer.score_batch([])), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import base64
+import unittest
+from url_index import canonical_url, clean_url, url_hash
+
+def google_news_link(target):
+    # news.google.com/rss/articles/<id> embeds the target URL in a protobuf-like payload
+    payload = base64.urlsafe_b64encode(b'\x08\x13"\x1b' + target.encode('ascii') + b'\xd2\x01\x00')
+    return f"https://news.google.com/rss/articles/{payload.decode('ascii').rstrip('=')}?oc=5"
+
+class CleanUrlTest(unittest.TestCase):
+    def test_cleaned_links(self):
+        cases = [
+            ('', ''),
+            ('  https://www.ansa.it/a.html  ', 'https://www.ansa.it/a.html'),
+            ('//www.ansa.it/a.html', 'https://www.ansa.it/a.html'),
+            # GoogleNews appends "&ved=...&usg=..." without a "?"
+            ('https://www.ansa.it/a.html&ved=2ahUKE&usg=AOvVaw', 'https://www.ansa.it/a.html'),
+            ('https://www.google.com/url?q=https://www.ansa.it/a.html&sa=U&ved=2ah', 'https://www.ansa.it/a.html'),
+            ('https://news.google.com/rss/articles/x?url=https://www.ansa.it/a.html', 'https://www.ansa.it/a.html'),
+            (google_news_link('https://www.ansa.it/sito/a.html'), 'https://www.ansa.it/sito/a.html'),
+        ]
+        for url, expected in cases:
+            with self.subTest(url=url):
+                self.assertEqual(clean_url(url), expected)
+
+    def test_published_links_are_kept_as_they_are(self):
+        for url in ['https://www.ilsole24ore.com/art/x?from=20&ref=home',
+                    'https://www.ansa.it/a.html?utm_source=rss',
+                    'https://x.it/cerca?q=polizza%20vita',
+                    'https://www.corriere.it/economia/articolo/amp/']:
+            with self.subTest(url=url):
+                self.assertEqual(clean_url(url), url)
+
+class CanonicalUrlTest(unittest.TestCase):
+    def test_canonical_forms(self):
+        cases = [
+            ('http://www.Example.it/a/?utm_source=x&b=2&fbclid=1&a=1#frag', 'https://example.it/a?a=1&b=2'),
+            ('https://m.repubblica.it//economia//a/', 'https://repubblica.it/economia/a'),
+            ('https://x.it:8080/a', 'https://x.it:8080/a'),
+            # AMP paths and hosts
+            ('https://www.corriere.it/economia/articolo/amp/', 'https://corriere.it/economia/articolo'),
+            ('https://www.corriere.it/economia/articolo.amp.html', 'https://corriere.it/economia/articolo.html'),
+            ('https://www.corriere.it/economia/articolo/amp.html', 'https://corriere.it/economia/articolo.html'),
+            ('https://amp.ansa.it/a.html', 'https://ansa.it/a.html'),
+            ('https://www-ansa-it.cdn.ampproject.org/c/s/www.ansa.it/sito/a.html', 'https://ansa.it/sito/a.html'),
+            ('https://x.it/campo.html', 'https://x.it/campo.html'),
+            # Google wrappers are unwrapped first
+            ('https://www.google.it/url?q=https://www.ansa.it/a.html%3Futm_medium%3Dsocial', 'https://ansa.it/a.html'),
+        ]
+        for url, expected in cases:
+            with self.subTest(url=url):
+                self.assertEqual(canonical_url(url), expected)
+
+    def test_content_params_are_kept(self):
+        # Regression: "from" selects a page of results, so from=20 and from=40 are different links
+        self.assertEqual(canonical_url('https://www.ilsole24ore.com/art/x?from=20'),
+                         'https://ilsole24ore.com/art/x?from=20')
+        self.assertNotEqual(url_hash('https://www.ilsole24ore.com/art/x?from=20'),
+                            url_hash('https://www.ilsole24ore.com/art/x?from=40'))
+        for name in ('ref', 'src', 'output', 'share', 'spm'):
+            with self.subTest(param=name):
+                self.assertIn(f'{name}=1', canonical_url(f'https://x.it/a?{name}=1'))
+
+    def test_variants_share_a_hash(self):
+        variants = ['https://www.ansa.it/sito/a.html',
+                    'http://ansa.it/sito/a.html?utm_source=rss&gclid=abc',
+                    'https://amp.ansa.it/sito/a.amp.html#top',
+                    google_news_link('https://www.ansa.it/sito/a.html')]
+        self.assertEqual(len({url_hash(url) for url in variants}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import hashlib
+import re
+import unicodedata
+from config import COMPANY_NAMES, COMPANY_VARIATIONS, STOPWORD_FILES
+from memo import BoundedMemo
+
+# Basic Italian stop words
+ITALIAN_STOP_WORDS = {
+    'il', 'lo', 'la', 'i', 'gli', 'le', 'un', 'uno', 'una', 'di', 'a', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra',
+    'e', 'ed', 'o', 'ma', 'che', 'chi', 'cui', 'non', 'è', 'come', 'dove', 'quando', 'perché'
+}
+
+# Insurance vocabulary common to every company, so it carries no topic
+INSURANCE_STOP_WORDS = {
+    'assicurazioni', 'assicurazione', 'assicurativa', 'assicurative', 'assicurativi', 'assicurativo',
+    'polizza', 'polizze', 'agenzia', 'agenzie', 'broker', 'compagnia', 'compagnie', 'spa', 'srl',
+    'mercato', 'settore', 'gruppo', 'società'
+}
+
+# Company names glued together, as they appear in hashtags and URLs
+COMPANY_COMPOUNDS = {
+    'vitanuova', 'vitanuovaassicurazioni', 'unideaassicurazioni', 'alleanzaassicurazioni',
+    'vitanuovaspa', 'unideaspa', 'alleanzaspa'
+}
+
+_stop_word_lists = {}
+
+def load_stop_words(language):
+    """Stop words for language from the list shipped in data/, read on first use."""
+    words = _stop_word_lists.get(language)
+    if words is None:
+        with open(STOPWORD_FILES[language], encoding='utf-8') as f:
+            words = frozenset(line.strip() for line in f if line.strip())
+        _stop_word_lists[language] = words
+    return words
+
+def _company_words():
+    words = set()
+    for name in COMPANY_NAMES:
+        words.update(word.lower() for word in name.split())
+        for variation in COMPANY_VARIATIONS.get(name, []):
+            words.update(word.lower() for word in variation.split())
+    # Keep only alphabetic tokens ("s.p.a." and "ass." never survive word cleaning)
+    return {word for word in words if word.isalpha()}
+
+# Distinct words remembered by a StopWordFilter before its cache is reset
+MAX_CACHED_WORDS = 200000
+
+class StopWordFilter:
+    """Stop-word test built once: an exact-match set plus one regex for words that must not appear inside a token.
+
+    Short function words ("a", "e", "il") are only removed as whole tokens;
+    matching them inside tokens would reject almost every Italian word.
+    """
+
+    def __init__(self, stop_words, min_contained_length=4):
+        self.stop_words = frozenset(stop_words)
+        contained = sorted((w for w in self.stop_words if len(w) >= min_contained_length), key=len, reverse=True)
+        self.contained_pattern = re.compile('|'.join(re.escape(w) for w in contained)) if contained else None
+        self.cache = BoundedMemo(MAX_CACHED_WORDS, self._check)
+
+    def _check(self, word):
+        return word in self.stop_words or bool(self.contained_pattern and self.contained_pattern.search(word))
+
+    def is_stop_word(self, word):
+        """True if word is a stop word or contains a company/insurance term."""
+        return self.cache[word]
+
+# Shared by word clouds and topic extraction
+STOP_WORDS = ITALIAN_STOP_WORDS | INSURANCE_STOP_WORDS | COMPANY_COMPOUNDS | _company_words()
+STOP_WORD_FILTER = StopWordFilter(STOP_WORDS)
+
+# Runs of letters (accented ones included); digits, punctuation and apostrophes split words
+WORD_RE = re.compile(r'[^\W\d_]+')
+
+def normalize_text(text):
+    """Lowercase text in composed Unicode form, so "società" typed either way is one word."""
+    return unicodedata.normalize('NFC', text or '').lower()
+
+def tokenize(text):
+    """Lowercase words of text: "dell'assicurazione" -> ["dell", "assicurazione"]."""
+    return WORD_RE.findall(normalize_text(text))
+
+def article_text(article):
+    """Text used for sentiment and topics: the full body when available, else the snippet."""
+    body = article.get('content') or article.get('description') or article.get('desc') or ''
+    return f"{article.get('title') or ''} {body}"
+
+def text_key(text):
+    """Content hash of a text, insensitive to whitespace differences."""
+    normalized = ' '.join((text or '').split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def prepare_article(article):
+    """Normalize and tokenize an article once, caching the result on the article."""
+    article['normalized_text'] = normalize_text(article_text(article))
+    article['tokens'] = WORD_RE.findall(article['normalized_text'])
+    return article
+
+def prepare_articles(articles):
+    for article in articles:
+        prepare_article(article)
+    return articles
+
+def article_tokens(article):
+    """Cached token list of an article, prepared on first use."""
+    if 'tokens' not in article:
+        prepare_article(article)
+    return article['tokens']
@@ -0,0 +1,76 @@
+import numpy as np
+from scipy import sparse
+from company_matcher import KeywordAutomaton
+from memo import BoundedMemo
+
+# Topic categories and the terms that signal them (matched anywhere inside a word)
+TOPIC_CATEGORIES = {
+    'Environmental': ['sostenibilità', 'ambiente', 'green', 'climate', 'energia', 'rinnovabile', 'emissioni', 'riciclo'],
+    'Digital Innovation': ['innovazione', 'digitale', 'tecnologia', 'digital', 'startup', 'intelligenza', 'app', 'online'],
+    'Investment': ['finanza', 'investimenti', 'risparmio', 'mercato', 'economia', 'finanziario', 'borsa', 'trading'],
+    'Health Services': ['salute', 'sanitario', 'benessere', 'prevenzione', 'medico', 'assistenza', 'clinica', 'terapia'],
+    'Community Support': ['sociale', 'comunità', 'welfare', 'solidarietà', 'inclusione', 'diversity', 'volontariato', 'donazioni'],
+    'Business Growth': ['business', 'strategia', 'partnership', 'crescita', 'sviluppo', 'mercato', 'espansione', 'acquisizione'],
+    'Customer Service': ['clienti', 'servizio', 'assistenza', 'supporto', 'soddisfazione', 'qualità', 'esperienza', 'consulenza'],
+    'Product Innovation': ['prodotti', 'soluzioni', 'novità', 'lancio', 'offerta', 'polizza', 'copertura', 'protezione'],
+    'Market Position': ['leadership', 'competitività', 'posizione', 'quota', 'presenza', 'network', 'distribuzione', 'canali'],
+    'Risk Management': ['rischio', 'sicurezza', 'protezione', 'gestione', 'controllo', 'compliance', 'normativa', 'regolamento']
+}
+
+# Distinct words remembered before the word -> topics map is reset
+MAX_CACHED_WORDS = 200000
+
+class TopicIndex:
+    """Term -> categories index compiled once from a topic table.
+
+    A word seen before costs one dict lookup. A new word is resolved with a single
+    automaton pass over its characters, which finds every term it contains.
+    """
+
+    def __init__(self, categories=TOPIC_CATEGORIES):
+        self.topics = list(categories)
+        self.automaton = KeywordAutomaton()
+        for topic, terms in categories.items():
+            for term in terms:
+                self.automaton.add(term.lower(), topic)
+        self.automaton.build()
+        self.word_topics = BoundedMemo(MAX_CACHED_WORDS, self._find_topics)
+
+    def _find_topics(self, word):
+        return frozenset(topic for _, _, topic in self.automaton.iter_matches(word))
+
+    def topics_for(self, word):
+        """Categories whose terms occur in word."""
+        return self.word_topics[word]
+
+    def top_topics_from_counts(self, counts_by_company, n=3):
+        """{company: [(topic, score), ...]} for several companies' precomputed {term: count} totals in one call.
+
+        The companies' counts form one sparse company-by-term matrix, scored
+        against the term-by-category indicator of their joint vocabulary with a
+        single product, so a term used by every company is resolved once.
+        """
+        companies = list(counts_by_company)
+        vocabulary = {}
+        rows, columns, values = [], [], []
+        for row, term_counts in enumerate(counts_by_company.values()):
+            for term, count in term_counts.items():
+                rows.append(row)
+                columns.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(count)
+        topic_ids = {topic: i for i, topic in enumerate(self.topics)}
+        term_rows, topic_columns = [], []
+        for term, column in vocabulary.items():
+            for topic in self.topics_for(term):
+                term_rows.append(column)
+                topic_columns.append(topic_ids[topic])
+        counts = sparse.csr_matrix((np.array(values, dtype=np.int64), (rows, columns)),
+                                   shape=(len(companies), len(vocabulary)))
+        indicator = sparse.csr_matrix((np.ones(len(term_rows), dtype=np.int64), (term_rows, topic_columns)),
+                                      shape=(len(vocabulary), len(self.topics)))
+        scores = (counts @ indicator).toarray()
+        results = {}
+        for company, row in zip(companies, scores):
+            order = np.argsort(-row, kind='stable')[:n]
+            results[company] = [(self.topics[i], int(row[i])) for i in order if row[i] > 0]
+        return results
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import time
+from collections import Counter
+from config import TOPIC_STORE_FILE, TOPIC_MIN_TERM_LENGTH, TOPIC_COUNTING
+from heavy_hitters import SpaceSaving
+from storage import select_in
+from text_processing import article_tokens, article_text, text_key
+from url_index import url_hash
+
+class TopicStore:
+    """Per-company, per-day term counters on disk, updated only with newly ingested articles.
+
+    Counts for any window are a SUM over the stored day buckets, so old
+    articles are never re-tokenized.
+    """
+
+    def __init__(self, path=TOPIC_STORE_FILE, min_term_length=TOPIC_MIN_TERM_LENGTH):
+        self.path = path
+        self.min_term_length = min_term_length
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            'CREATE TABLE IF NOT EXISTS topic_counts ('
+            'company TEXT NOT NULL, day INTEGER NOT NULL, term TEXT NOT NULL, count INTEGER NOT NULL, '
+            'PRIMARY KEY (company, day, term));'
+            'CREATE TABLE IF NOT EXISTS ingested ('
+            'company TEXT NOT NULL, article_key INTEGER NOT NULL, PRIMARY KEY (company, article_key));'
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def article_key(article):
+        """Identity of an article: its canonical link hash, else a hash of its text."""
+        if article.get('url_hash') is not None:
+            return article['url_hash']
+        if article.get('link'):
+            return url_hash(article['link'])
+        return int(text_key(article_text(article))[:16], 16) - 2 ** 63
+
+    def ingest(self, company, articles):
+        """Add the term counts of articles not seen before for company; returns how many were new."""
+        keys = {}
+        for article in articles:
+            keys.setdefault(self.article_key(article), article)
+        known = {key for key, in select_in(
+            self.connection, 'SELECT article_key FROM ingested WHERE company = ? AND article_key IN ({placeholders})',
+            keys, (company,))}
+
+        today = int(time.time()) // 86400
+        buckets = Counter()
+        new_keys = []
+        for key, article in keys.items():
+            if key in known:
+                continue
+            new_keys.append((company, key))
+            timestamp = article.get('timestamp')
+            day = timestamp // 86400 if timestamp is not None else today
+            for term in article_tokens(article):
+                if len(term) >= self.min_term_length:
+                    buckets[(day, term)] += 1
+
+        if new_keys:
+            self.connection.executemany(
+                'INSERT INTO topic_counts (company, day, term, count) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (company, day, term) DO UPDATE SET count = count + excluded.count',
+                [(company, day, term, count) for (day, term), count in buckets.items()]
+            )
+            self.connection.executemany('INSERT INTO ingested (company, article_key) VALUES (?, ?)', new_keys)
+            self.connection.commit()
+        return len(new_keys)
+
+    def term_counts(self, company, since_timestamp=None, until_timestamp=None, mode=None):
+        """{term: count} for company, summed over the days in the window.
+
+        In 'streaming' mode (TOPIC_COUNTING) the day buckets are streamed through
+        a Space-Saving summary instead, so only the TOPIC_COUNTING['capacity']
+        heaviest terms are held in memory and returned, with counts that may be
+        overestimated by up to total / capacity.
+        """
+        query = ' FROM topic_counts WHERE company = ?'
+        params = [company]
+        if since_timestamp is not None:
+            query += ' AND day >= ?'
+            params.append(since_timestamp // 86400)
+        if until_timestamp is not None:
+            query += ' AND day <= ?'
+            params.append(until_timestamp // 86400)
+        if (mode or TOPIC_COUNTING['mode']) == 'streaming':
+            summary = SpaceSaving(TOPIC_COUNTING['capacity'])
+            summary.update_counts(self.connection.execute('SELECT term, count' + query, params))
+            return dict(summary.most_common())
+        return dict(self.connection.execute('SELECT term, SUM(count)' + query + ' GROUP BY term', params))
+
+    def close(self):
+        self.connection.close()
@@ -7,6 +7,7 @@ import json
 from datetime import datetime
 import pandas as pd
 from news_scraper import NewsScraperAnalyzer
+from url_index import url_hash
 import webbrowser
 
 class MasterRunner:
@@ -121,7 +122,10 @@ class MasterRunner:
                 
             if all_dfs:
                 master_df = pd.concat(all_dfs, ignore_index=True)
-                master_df.drop_duplicates(subset=['url'], keep='last', inplace=True)
+                # Compare canonical links, so tracking parameters and http/https variants collapse
+                master_df['url_hash'] = master_df['url'].fillna('').map(url_hash)
+                master_df.drop_duplicates(subset=['url_hash'], keep='last', inplace=True)
+                master_df.drop(columns=['url_hash'], inplace=True)
                 master_df.to_csv('master_results.csv', index=False, encoding='utf-8-sig')
                 self.logger.info("Results consolidated into master_results.csv")
                 
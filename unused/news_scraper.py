@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, timezone
 import requests
 from bs4 import BeautifulSoup
 from newspaper import Article
-from textblob import TextBlob
+from sentiment import cached_polarity
 import pandas as pd
 import logging
 from config import *
@@ -13,6 +13,8 @@ import urllib.parse
 import feedparser
 import html
 import json
+from site_extraction import extract_site_articles
+from company_matcher import CompanyMatcher
 
 # Suppress pandas warnings
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -33,6 +35,7 @@ class NewsScanner:
         self.sources = [
             {
                 'url': 'https://www.assinews.it/categoria/compagnie/',
+                'container_selector': 'article',
                 'title_selector': 'h2.entry-title',
                 'content_selector': 'div.entry-content',
                 'date_selector': 'time.entry-date',
@@ -40,6 +43,7 @@ class NewsScanner:
             },
             {
                 'url': 'https://www.insuranceup.it/category/mercato/',
+                'container_selector': 'article',
                 'title_selector': 'h3.entry-title',
                 'content_selector': 'div.entry-content',
                 'date_selector': 'time.entry-date',
@@ -47,6 +51,7 @@ class NewsScanner:
             },
             {
                 'url': 'https://www.intermediachannel.it/category/compagnie/',
+                'container_selector': 'article',
                 'title_selector': 'h2.entry-title',
                 'content_selector': 'div.entry-content',
                 'date_selector': 'time.entry-date',
@@ -90,6 +95,9 @@ class NewsScanner:
             ]
         }
         
+        # Single automaton over all search terms and tracked keywords
+        self.matcher = CompanyMatcher(self.search_terms, KEYWORDS)
+        
         self.results = {
             'main_companies': [],  # Vita Nuova and Unidea news
             'alleanza': [],       # Alleanza news
@@ -107,8 +115,7 @@ class NewsScanner:
 
     def get_sentiment(self, text):
         try:
-            analysis = TextBlob(text)
-            score = analysis.sentiment.polarity
+            score = cached_polarity(text)
             if score > 0.1:
                 return 'positive'
             elif score < -0.1:
@@ -132,20 +139,8 @@ class NewsScanner:
             return str(text)
 
     def check_company_mentions(self, text):
-        text = text.lower()
-        mentions = []
-        
-        # Check Vita Nuova and Unidea
-        for company in ['vita_nuova', 'unidea']:
-            if any(term in text for term in self.search_terms[company]):
-                if company not in mentions:
-                    mentions.append(company)
-        
-        # Check Alleanza
-        if any(term in text for term in self.search_terms['alleanza']):
-            mentions.append('alleanza')
-        
-        return mentions
+        # Vita Nuova, Unidea, then Alleanza, in one pass over the text
+        return self.matcher.mentions(text)
 
     def scan_news(self):
         print(f"\nScanning {len(self.sources)} news sites...")
@@ -161,31 +156,20 @@ class NewsScanner:
                 
                 soup = BeautifulSoup(response.content, 'lxml')
                 
-                # Find all articles
-                titles = soup.select(source['title_selector'])
-                contents = soup.select(source['content_selector'])
-                dates = soup.select(source['date_selector'])
-                links = soup.select(source['link_selector'])
-                
-                print(f"Found {len(titles)} potential articles")
+                # Find each article container once and read its fields from that subtree
+                articles = extract_site_articles(soup, source, limit=20)
                 
-                if not titles:
-                    print("No articles found with current selectors, trying alternative selectors...")
-                    # Try some common alternative selectors
-                    titles = soup.select('h2 a, h3 a, .article-title a, .title a')
-                    contents = soup.select('.article-content, .content, .article-body, .body')
-                    dates = soup.select('.date, .time, .published, .article-date')
-                    links = titles  # Links are usually in the title elements
+                print(f"Found {len(articles)} potential articles")
                 
                 processed = 0
                 
                 # Process each article
-                for title_elem, content_elem, date_elem, link_elem in zip(titles[:20], contents[:20], dates[:20], links[:20]):  # Limit to first 20 articles
+                for article in articles:
                     try:
-                        title = self.clean_text(title_elem.text)
-                        content = self.clean_text(content_elem.text)
-                        date = self.clean_text(date_elem.text)
-                        link = link_elem.get('href', '')
+                        title = self.clean_text(article['title'])
+                        content = self.clean_text(article['content'])
+                        date = self.clean_text(article['date'])
+                        link = article['link']
                         
                         # Make sure link is absolute
                         if link and not link.startswith('http'):
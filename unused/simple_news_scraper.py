@@ -1,11 +1,30 @@
 import requests
-from bs4 import BeautifulSoup, Comment
+from bs4 import BeautifulSoup, Comment, FeatureNotFound
 from datetime import datetime
 import time
-from textblob import TextBlob
+from sentiment import cached_polarity
 import json
 import re
 
+# Content-Type fragments that mean the body is a feed
+FEED_CONTENT_TYPES = ('xml', 'rss', 'atom')
+
+# Only the start of the body is inspected to recognise a feed
+FEED_SNIFF_BYTES = 512
+
+def choose_parser(content_type, content):
+    """Pick a single BeautifulSoup parser from the Content-Type header and the first bytes of the body."""
+    head = content[:FEED_SNIFF_BYTES].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    # The body wins over the header: many sites serve feeds as text/html
+    if b'<html' in head:
+        return 'lxml'
+    if head.startswith(b'<?xml') or b'<rss' in head or b'<feed' in head or b'<rdf:rdf' in head:
+        return 'xml'
+    content_type = (content_type or '').lower()
+    if any(feed_type in content_type for feed_type in FEED_CONTENT_TYPES):
+        return 'xml'
+    return 'lxml'
+
 class SimpleNewsScanner:
     def __init__(self):
         # Simple list of Italian news sources
@@ -114,15 +133,14 @@ class SimpleNewsScanner:
                     print(f"Error: Got status code {response.status_code}")
                     continue
                 
-                # Try different parsers if the first one fails
-                for parser in ['xml', 'lxml', 'html.parser']:
-                    try:
-                        soup = BeautifulSoup(response.content, parser)
-                        items = soup.find_all(['item', 'entry'])
-                        if items:
-                            break
-                    except:
-                        continue
+                # Parse once with the parser that matches the response
+                parser = choose_parser(response.headers.get('Content-Type'), response.content)
+                try:
+                    soup = BeautifulSoup(response.content, parser)
+                except FeatureNotFound:
+                    # lxml not installed
+                    soup = BeautifulSoup(response.content, 'html.parser')
+                items = soup.find_all(['item', 'entry'])
                 
                 if not items:
                     print("No news items found")
@@ -213,8 +231,7 @@ class SimpleNewsScanner:
 
     def get_sentiment(self, text):
         try:
-            analysis = TextBlob(text)
-            score = analysis.sentiment.polarity
+            score = cached_polarity(text)
             if score > 0.1:
                 return 'positive'
             elif score < -0.1:
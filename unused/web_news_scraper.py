@@ -2,7 +2,7 @@ import requests
 from bs4 import BeautifulSoup, Comment
 from datetime import datetime
 import time
-from textblob import TextBlob
+from sentiment import cached_polarity
 import json
 import re
 
@@ -108,8 +108,7 @@ class WebNewsScanner:
             if not text:
                 return {'score': 0.0, 'label': 'neutral'}
             
-            analysis = TextBlob(text)
-            score = analysis.sentiment.polarity
+            score = cached_polarity(text)
             
             if score > 0.1:
                 label = 'positive'
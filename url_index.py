@@ -0,0 +1,194 @@
+import base64
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import urllib.parse
+from config import URL_INDEX_FILE, URL_VALIDATION_MAX_AGE
+
+# Click-tracking ids, dropped from the dedupe key only; anything that may select
+# content (page, from, ref, output, ...) is kept
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid', 'twclid', 'ttclid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok'
+}
+TRACKING_PREFIXES = ('utm_', 'mc_', 'pk_', 'hsa_')
+
+# Host prefixes that serve the same page as the bare domain
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# /amp, /amp/ and .amp at the end of the path, or just before a final .html
+AMP_PATH_RE = re.compile(r'(?:/amp/?|\.amp)(?=(?:\.html?)?$)', re.I)
+AMP_CACHE_RE = re.compile(r'^/[cvi]/(?:s/)?([^/]+)(/.*)?$')
+GOOGLE_REDIRECT_HOSTS = {'google.com', 'google.it', 'news.google.com', 'www.google.com', 'www.google.it'}
+
+def _unwrap_google_news(parsed):
+    """Target of a Google redirect or News article link, if it can be recovered."""
+    params = urllib.parse.parse_qs(parsed.query)
+    for name in ('url', 'q', 'u'):
+        target = params.get(name, [''])[0]
+        if target.startswith('http'):
+            return target
+    # Older news.google.com/rss/articles/<base64> links embed the target URL
+    match = re.search(r'/articles/([A-Za-z0-9_-]+)', parsed.path)
+    if match:
+        payload = match.group(1)
+        try:
+            decoded = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        except (ValueError, TypeError):
+            return None
+        found = re.search(rb'https?://[\x21-\x7e]+', decoded)
+        if found:
+            return found.group(0).decode('ascii')
+    return None
+
+def clean_url(url):
+    """Link to open: Google redirect/News wrappers removed, everything else left as it is."""
+    url = (url or '').strip()
+    if not url:
+        return ''
+    if url.startswith('//'):
+        url = 'https:' + url
+    # GoogleNews results append "&ved=...&usg=..." without a "?"
+    if '&' in url and '?' not in url:
+        url = url.split('&', 1)[0]
+
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.netloc.lower()
+    if host in GOOGLE_REDIRECT_HOSTS or (host.endswith('.google.com') and parsed.path.startswith(('/url', '/rss/articles'))):
+        target = _unwrap_google_news(parsed)
+        if target:
+            return clean_url(target)
+
+    return url
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonical_url(url):
+    """Identity form of a link, used only as a dedupe key: http/https, host case,
+    www/m/amp hosts, AMP paths, trailing slashes, fragments, click-tracking ids and
+    parameter order all compare equal."""
+    url = clean_url(url)
+    if not url:
+        return ''
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.hostname or ''
+    path = parsed.path
+
+    # AMP cache: https://<host>.cdn.ampproject.org/c/s/<origin host>/<path>
+    if host.endswith('.cdn.ampproject.org'):
+        match = AMP_CACHE_RE.match(path)
+        if match:
+            host, path = match.group(1).lower(), match.group(2) or '/'
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+
+    path = AMP_PATH_RE.sub('', re.sub(r'/{2,}', '/', path)) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = urllib.parse.urlencode(sorted((k, v) for k, v in urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+                                          if not is_tracking_param(k)))
+    return urllib.parse.urlunsplit(('https', host, path, query, ''))
+
+def url_hash(url):
+    """Signed 64-bit hash of the canonical URL (fits an SQLite INTEGER)."""
+    digest = hashlib.blake2b(canonical_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+class UrlIndex:
+    """Set of canonical URL hashes for O(1) identity checks, optionally persisted in SQLite.
+
+    All hashes are held in memory; new ones are written back on save(). With
+    max_age, only URLs recorded (or re-recorded) within the last max_age
+    seconds are loaded, so older ones are treated as unseen again.
+    """
+
+    def __init__(self, path=None, max_age=None):
+        self.path = path
+        self.hashes = set()
+        self.pending = {}
+        self.connection = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(path)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS urls ('
+                'url_hash INTEGER PRIMARY KEY, url TEXT NOT NULL, first_seen INTEGER NOT NULL, last_checked INTEGER)'
+            )
+            columns = {row[1] for row in self.connection.execute('PRAGMA table_info(urls)')}
+            if 'last_checked' not in columns:
+                # Index files written before last_checked existed
+                self.connection.execute('ALTER TABLE urls ADD COLUMN last_checked INTEGER')
+                self.connection.execute('UPDATE urls SET last_checked = first_seen')
+                self.connection.commit()
+            if max_age is None:
+                rows = self.connection.execute('SELECT url_hash FROM urls')
+            else:
+                rows = self.connection.execute('SELECT url_hash FROM urls WHERE last_checked >= ?',
+                                               (int(time.time()) - max_age,))
+            self.hashes.update(row[0] for row in rows)
+
+    def __contains__(self, url):
+        return url_hash(url) in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def add(self, url):
+        """Record url; False if an equivalent URL was already in the index."""
+        key = url_hash(url)
+        if key in self.hashes:
+            return False
+        self.hashes.add(key)
+        if self.connection is not None:
+            self.pending[key] = canonical_url(url)
+        return True
+
+    def save(self):
+        if self.connection is None or not self.pending:
+            return
+        now = int(time.time())
+        self.connection.executemany(
+            'INSERT INTO urls (url_hash, url, first_seen, last_checked) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (url_hash) DO UPDATE SET last_checked = excluded.last_checked',
+            [(key, url, now, now) for key, url in self.pending.items()]
+        )
+        self.connection.commit()
+        self.pending = {}
+
+    def close(self):
+        self.save()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+def dedupe_by_url(articles, link_key='link'):
+    """Drop articles whose link is equivalent to an earlier one's; stores 'url_hash' on each kept article."""
+    seen = set()
+    unique = []
+    for article in articles:
+        link = article.get(link_key)
+        if not link:
+            unique.append(article)
+            continue
+        key = url_hash(link)
+        if key in seen:
+            continue
+        seen.add(key)
+        article['url_hash'] = key
+        unique.append(article)
+    return unique
+
+def open_validated_urls(path=URL_INDEX_FILE, max_age=URL_VALIDATION_MAX_AGE):
+    """Persistent index of links checked reachable within the last max_age seconds."""
+    return UrlIndex(path, max_age)